@@ -0,0 +1,141 @@
+# Runs many Lox programs across a pool of worker processes
+#
+# Usage: python batch.py [--jobs N] [--output PATH] [lox options]
+#                        paths...
+#
+# Paths can be files, directories (searched for .lox files)
+# or glob patterns. Every program runs in a worker with its
+# output captured, and a JSON summary with the output, exit
+# status and time of each program is printed once all are done.
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from lox import ENGINES, SCANNERS, Lox
+
+
+def find_programs(paths: list[str]):
+    programs = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            found = glob.glob(os.path.join(path, "**", "*.lox"),
+                              recursive=True)
+        elif os.path.exists(path):
+            found = [path]
+        else:
+            found = glob.glob(path, recursive=True)
+
+        programs.extend(sorted(found))
+
+    # Keep the first occurrence of programs given twice
+    return list(dict.fromkeys(programs))
+
+
+def run_program(path: str, options: dict):
+    """
+    Run one program in a worker. Workers are reused between
+    programs, so the error flags Lox keeps on the class are
+    reset first, and the exit() of a failed program is caught
+    instead of ending the worker.
+    """
+    Lox.has_error = False
+    Lox.has_runtime_error = False
+
+    output = io.StringIO()
+    status = "ok"
+    exit_code = 0
+    start = time.perf_counter()
+
+    with redirect_stdout(output):
+        try:
+            Lox(**options).runFile(path)
+
+        except SystemExit as error:
+            exit_code = error.code if type(error.code) == int else 1
+
+            if Lox.has_runtime_error:
+                status = "runtime_error"
+            elif Lox.has_error:
+                status = "syntax_error"
+            else:
+                status = "error"
+
+        except Exception:
+            # A bug in the interpreter, not in the program
+            status = "crashed"
+            exit_code = 1
+            output.write(traceback.format_exc())
+
+    return {
+        "path": path,
+        "status": status,
+        "exit_code": exit_code,
+        "seconds": time.perf_counter() - start,
+        "output": output.getvalue(),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="batch.py")
+    arg_parser.add_argument("paths", nargs="+",
+                            help="programs, directories or glob patterns")
+    arg_parser.add_argument("--jobs", "-j", type=int,
+                            default=os.cpu_count(),
+                            help="number of worker processes "
+                                 "(default: one per CPU)")
+    arg_parser.add_argument("--output",
+                            help="write the summary to a file "
+                                 "instead of stdout")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="tree")
+    arg_parser.add_argument("--scanner", choices=SCANNERS, default="char")
+    arg_parser.add_argument("--no-cache", dest="cache",
+                            action="store_false")
+    arg_parser.add_argument("--cache-dir")
+    arg_parser.add_argument("-O", dest="optimize", action="store_true")
+    args = arg_parser.parse_args()
+
+    options = {
+        "engine": args.engine,
+        "scanner": args.scanner,
+        "cache": args.cache,
+        "cache_dir": args.cache_dir,
+        "optimize": args.optimize,
+    }
+
+    programs = find_programs(args.paths)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(run_program, programs,
+                                [options] * len(programs)))
+
+    failed = sum(result["status"] != "ok" for result in results)
+    summary = {
+        "programs": len(results),
+        "failed": failed,
+        "jobs": args.jobs,
+        "seconds": time.perf_counter() - start,
+        "results": results,
+    }
+
+    if args.output != None:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
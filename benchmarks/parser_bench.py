@@ -0,0 +1,85 @@
+# Compares the parsers on the same tokens of a large generated source
+#
+# Usage: python benchmarks/parser_bench.py [lines] [repeat]
+
+from os import path
+import sys
+import time
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import lox
+from scanner.scanner import Scanner
+
+# Expression heavy, every line has a few levels of precedence
+SNIPPET = """\
+var value{name} = {n} * 2.5 + (3 - {n}) / 4 % 7;
+if (value{name} >= 10 and !(value{name} == 12.25) or -value{name} < 0) {{
+    value{name} = value{name} * value{name} - {n} / (1 + {n});
+    print "value " + "{n}" + "!" == "value";
+}} else {{
+    while (value{name} < 100 and true) value{name} = value{name} + 1;
+}}
+"""
+
+
+def letters(n: int):
+    # Identifiers can't contain digits
+    name = ""
+
+    while True:
+        name = chr(ord("a") + n % 26) + name
+        n //= 26
+
+        if n == 0:
+            return name
+
+
+def generate(lines: int):
+    snippet_lines = SNIPPET.count("\n")
+    return "".join(SNIPPET.format(n=n, name=letters(n))
+                   for n in range(lines // snippet_lines + 1))
+
+
+def best_time(parser_class, tokens: list, repeat: int):
+    best = None
+    tree = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tree = parser_class(tokens).parse()
+        elapsed = time.perf_counter() - start
+
+        if best == None or elapsed < best:
+            best = elapsed
+
+    return best, tree
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    source = generate(lines)
+    tokens = Scanner(source).scan()
+    print(f"{source.count(chr(10))} lines, {len(tokens)} tokens")
+
+    base_time, base_tree = best_time(lox.PARSERS["recursive"], tokens,
+                                     repeat)
+    print(f"{'recursive':<10} {base_time:.3f}s")
+
+    for name, parser_class in lox.PARSERS.items():
+        if name == "recursive":
+            continue
+
+        elapsed, tree = best_time(parser_class, tokens, repeat)
+
+        if tree != base_tree:
+            print(f"{name} parses a different tree!")
+            exit(1)
+
+        print(f"{name:<10} {elapsed:.3f}s ({base_time / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# Times every phase of running the programs in benchmarks/programs
+#
+# Usage: python benchmarks/run.py [--engine NAME ...] [--parser NAME]
+#                                 [--warmup N] [--repeat N]
+#                                 [--output PATH]
+#                                 [--compare PATH] [names...]
+#
+# Each repetition scans, parses, resolves and interprets a program
+# from scratch, timing each phase on its own. Besides the programs,
+# a large generated source stresses the scanner and the parser.
+# Results can be written as JSON and compared against a previous
+# run, on another commit or engine.
+
+from os import path
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+PROGRAMS = path.join(ROOT, "benchmarks", "programs")
+
+sys.path.insert(0, ROOT)
+
+import lox
+from embed import DiagnosticList
+from interpreter.optimizer import Optimizer
+from interpreter.resolver import Resolver
+
+PHASES = ("scan", "parse", "resolve", "interpret")
+
+# Lines of the generated source
+GENERATED_LINES = 20_000
+
+SNIPPET = """\
+// generated block {n}
+var value{name} = {n} * 2.5 + (3 - {n}) / 4;
+if (value{name} >= 10 and !(value{name} == 12.25)) {{
+    var text = "value " + "{n}";
+}} else {{
+    while (value{name} < 100) value{name} = value{name} + 1;
+}}
+"""
+
+
+def letters(n: int):
+    # Identifiers can't contain digits
+    name = ""
+
+    while True:
+        name = chr(ord("a") + n % 26) + name
+        n //= 26
+
+        if n == 0:
+            return name
+
+
+def generate(lines: int):
+    snippet_lines = SNIPPET.count("\n")
+    return "".join(SNIPPET.format(n=n, name=letters(n))
+                   for n in range(lines // snippet_lines + 1))
+
+
+def load_programs(names: list[str]):
+    programs = {}
+
+    for file in sorted(os.listdir(PROGRAMS)):
+        if not file.endswith(".lox"):
+            continue
+
+        with open(path.join(PROGRAMS, file)) as source:
+            programs[file[:-4]] = source.read()
+
+    programs["generated"] = generate(GENERATED_LINES)
+
+    if names:
+        programs = {name: source for name, source in programs.items()
+                    if name in names}
+
+    return programs
+
+
+def run_once(source: str, engine: str, scanner: str, parser: str,
+             optimize: bool):
+    """
+    Run the program once, returns the seconds spent in each phase
+    """
+    times = {}
+    errors = DiagnosticList()
+
+    start = time.perf_counter()
+    tokens = lox.SCANNERS[scanner](source, errors).scan()
+    times["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree = lox.PARSERS[parser](tokens, errors).parse()
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    Resolver(errors).resolve(tree)
+
+    if optimize and not errors.diagnostics:
+        tree = Optimizer().optimize(tree)
+        Resolver(errors).resolve(tree)
+
+    times["resolve"] = time.perf_counter() - start
+
+    if errors.diagnostics:
+        raise SystemExit(f"{errors.diagnostics[0]}")
+
+    # Output is kept out of the terminal and out of the timings
+    interpreter = lox.ENGINES[engine](stdout=io.StringIO())
+
+    start = time.perf_counter()
+    interpreter.execute_program(tree)
+    times["interpret"] = time.perf_counter() - start
+
+    return times
+
+
+def summarize(samples: list[float]):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "max": max(samples),
+    }
+
+
+def benchmark(source: str, engine: str, scanner: str, parser: str,
+              optimize: bool, warmup: int, repeat: int):
+    for _ in range(warmup):
+        run_once(source, engine, scanner, parser, optimize)
+
+    samples = {phase: [] for phase in PHASES}
+
+    for _ in range(repeat):
+        for phase, seconds in run_once(source, engine, scanner,
+                                       parser, optimize).items():
+            samples[phase].append(seconds)
+
+    samples["total"] = [sum(run) for run in zip(*samples.values())]
+
+    return {phase: summarize(times) for phase, times in samples.items()}
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: list[dict], baseline: dict):
+    print(f"{'program':<18} {'engine':<8} "
+          + " ".join(f"{phase:>10}" for phase in PHASES + ("total",))
+          + ("  vs baseline" if baseline else ""))
+
+    for result in results:
+        medians = [result["phases"][phase]["median"]
+                   for phase in PHASES + ("total",)]
+        line = f"{result['program']:<18} {result['engine']:<8} " \
+            + " ".join(f"{median * 1000:>8.2f}ms" for median in medians)
+
+        old = baseline.get((result["program"], result["engine"]))
+
+        if old != None:
+            ratio = old["phases"]["total"]["median"] / medians[-1]
+            line += f"  {ratio:.2f}x"
+
+        print(line)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="benchmarks/run.py")
+    arg_parser.add_argument("names", nargs="*",
+                            help="programs to run (default: all)")
+    arg_parser.add_argument("--engine", action="append",
+                            choices=lox.ENGINES,
+                            help="engine to time, can be repeated "
+                                 "(default: tree)")
+    arg_parser.add_argument("--scanner", choices=lox.SCANNERS,
+                            default="char")
+    arg_parser.add_argument("--parser", choices=lox.PARSERS,
+                            default="recursive")
+    arg_parser.add_argument("-O", dest="optimize", action="store_true")
+    arg_parser.add_argument("--warmup", type=int, default=1)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--output", help="write the results as JSON")
+    arg_parser.add_argument("--compare",
+                            help="JSON results of a previous run to "
+                                 "compare the total times with")
+    args = arg_parser.parse_args()
+
+    engines = args.engine or ["tree"]
+    baseline = {}
+
+    if args.compare != None:
+        with open(args.compare) as file:
+            for result in json.load(file)["results"]:
+                baseline[(result["program"], result["engine"])] = result
+
+    results = []
+
+    for name, source in load_programs(args.names).items():
+        for engine in engines:
+            results.append({
+                "program": name,
+                "engine": engine,
+                "phases": benchmark(source, engine, args.scanner,
+                                    args.parser, args.optimize, args.warmup,
+                                    args.repeat),
+            })
+
+    print_table(results, baseline)
+
+    if args.output != None:
+        with open(args.output, "w") as file:
+            json.dump({
+                "commit": commit(),
+                "python": platform.python_version(),
+                "scanner": args.scanner,
+                "parser": args.parser,
+                "optimize": args.optimize,
+                "warmup": args.warmup,
+                "repeat": args.repeat,
+                "results": results,
+            }, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
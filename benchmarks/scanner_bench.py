@@ -0,0 +1,67 @@
+# Compares Scanner and RegexScanner on a large generated source
+#
+# Usage: python benchmarks/scanner_bench.py [lines] [repeat]
+
+from os import path
+import sys
+import time
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import lox
+from scanner.regex_scanner import RegexScanner
+from scanner.scanner import Scanner
+
+SNIPPET = """\
+// generated block {n}
+var value{n} = {n} * 2.5 + (3 - {n}) / 4;
+if (value{n} >= 10 and !(value{n} == 12.25)) {{
+    print "value " + "{n}";
+}} else {{
+    while (value{n} < 100) value{n} = value{n} + 1;
+}}
+"""
+
+
+def generate(lines: int):
+    snippet_lines = SNIPPET.count("\n")
+    return "".join(SNIPPET.format(n=n)
+                   for n in range(lines // snippet_lines + 1))
+
+
+def best_time(scanner_class, source: str, repeat: int):
+    best = None
+    tokens = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = scanner_class(source).scan()
+        elapsed = time.perf_counter() - start
+
+        if best == None or elapsed < best:
+            best = elapsed
+
+    return best, tokens
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    source = generate(lines)
+    print(f"{source.count(chr(10))} lines, {len(source)} bytes")
+
+    char_time, char_tokens = best_time(Scanner, source, repeat)
+    regex_time, regex_tokens = best_time(RegexScanner, source, repeat)
+
+    if char_tokens != regex_tokens:
+        print("Token streams differ!")
+        exit(1)
+
+    print(f"{len(char_tokens)} tokens")
+    print(f"Scanner:      {char_time:.3f}s")
+    print(f"RegexScanner: {regex_time:.3f}s ({char_time / regex_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
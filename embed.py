@@ -0,0 +1,156 @@
+# Library API for running Lox from Python
+#
+#     import embed
+#
+#     program = embed.compile("var total = price * quantity;")
+#     result = program.run(globals={"price": 2.5, "quantity": 4})
+#     result["total"]  # 10.0
+#
+#     output = embed.Output.capture()
+#     embed.compile('print "hi";').run(stdout=output)
+#     output.getvalue()  # "hi\n"
+#
+# Nothing here touches the class-level state of Lox, nothing is
+# printed unless the program prints and nothing calls exit(), so
+# a compiled program can be run any number of times, from any
+# number of threads at once.
+
+# lox first, the interpreter modules import it back
+from lox import ENGINES, PARSERS, SCANNERS
+from dataclasses import dataclass
+from interpreter.budget import Budget, BudgetExceeded
+from interpreter.lox_runtime_error import LoxRuntimeError
+from interpreter.optimizer import Optimizer
+from interpreter.output import Output
+from interpreter.resolver import Resolver
+from scanner.token import Token
+from scanner.token_type import TokenType as tt
+
+__all__ = ["compile", "Program", "CompileError", "Diagnostic",
+           "LoxRuntimeError", "Budget", "BudgetExceeded", "Output"]
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    line: int
+    where: str
+    message: str
+
+    def __str__(self):
+        return f"[line {self.line}] Error{self.where}: {self.message}"
+
+
+class CompileError(Exception):
+    """
+    Raised by compile when the source has errors,
+    `diagnostics` holds every one of them in order
+    """
+
+    def __init__(self, diagnostics: list[Diagnostic]):
+        super().__init__("\n".join(map(str, diagnostics)))
+        self.diagnostics = diagnostics
+
+
+class DiagnosticList:
+    """
+    Collects the errors of one compilation instead of
+    printing them, same interface as Lox's report and error
+    """
+
+    def __init__(self):
+        self.diagnostics: list[Diagnostic] = []
+
+    def report(self, line: int, where: str, message: str):
+        self.diagnostics.append(Diagnostic(line, where or "", message))
+
+    def error(self, token: Token, message: str):
+        if token.type == tt.EOF:
+            self.report(token.line, " at end", message)
+        else:
+            self.report(token.line, f" at '{token.lexeme}'", message)
+
+
+class Program:
+    """
+    A compiled program, ready to run. Whatever form the engine
+    executes (the tree, closures, bytecode, Python or an arena)
+    is built once and shared between runs.
+    """
+
+    def __init__(self, tree, engine: str):
+        self.tree = tree
+        self.engine = engine
+        self.compiled = ENGINES[engine].compile_program(tree)
+
+    def run(self, globals: dict = None, stdout=None,
+            budget: Budget = None) -> dict:
+        """
+        Run the program in a fresh interpreter and return its
+        globals once it's done. `globals` are defined before it
+        starts, ints are converted to Lox numbers. `print` writes
+        to `stdout`, sys.stdout if it's None, which is flushed when
+        the program ends or fails if it has a flush(). Pass an
+        Output to buffer what it prints, or Output.capture() to
+        keep it in memory.
+
+        Raises LoxRuntimeError if the program fails, with the
+        message and the token (`error.token.line`) it failed at,
+        or BudgetExceeded if it goes over `budget`, whose `used`
+        has the steps taken either way.
+        """
+        interpreter = ENGINES[self.engine](stdout=stdout, budget=budget)
+        variables = interpreter.globals.variables
+
+        for name, value in (globals or {}).items():
+            if type(value) == int:
+                value = float(value)
+
+            variables[name] = value
+
+        try:
+            interpreter.execute_compiled(self.compiled)
+        finally:
+            # Anything with a write() will do, not every sink flushes
+            flush = getattr(interpreter.stdout, "flush", None)
+
+            if flush != None:
+                flush()
+
+        return {name: value for name, value in variables.items()
+                if name != "clock"}
+
+
+def compile(source: str, engine: str = "tree", optimize: bool = False,
+            scanner: str = "char", parser: str = "recursive") -> Program:
+    """
+    Scan, parse and resolve `source`. Raises CompileError
+    listing every error found if it isn't a valid program.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'")
+
+    if scanner not in SCANNERS:
+        raise ValueError(f"Unknown scanner '{scanner}'")
+
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser '{parser}'")
+
+    errors = DiagnosticList()
+    tokens = SCANNERS[scanner](source, errors).scan()
+    tree = PARSERS[parser](tokens, errors).parse()
+
+    if errors.diagnostics:
+        raise CompileError(errors.diagnostics)
+
+    # Resolved before optimizing, so code the optimizer
+    # removes still has to be valid
+    Resolver(errors).resolve(tree)
+
+    if errors.diagnostics:
+        raise CompileError(errors.diagnostics)
+
+    if optimize:
+        tree = Optimizer().optimize(tree)
+        Resolver(errors).resolve(tree)
+
+    return Program(tree, engine)
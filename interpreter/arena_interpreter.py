@@ -0,0 +1,238 @@
+from interpreter.frame import Frame
+from interpreter.interpreter import Interpreter
+from interpreter.lox_runtime_error import LoxRuntimeError
+from parser.arena import Arena
+from parser.expr import Assign, Binary, Call, Literal, Logical, Unary, Grouping, Variable
+from parser.stmt import Block, Expression, If, Print, Stmt, Var, While
+from scanner.token_buffer import TYPE_CODES
+from scanner.token_type import TokenType as tt
+import lox
+
+BINARY = Binary.kind
+UNARY = Unary.kind
+CALL = Call.kind
+LITERAL = Literal.kind
+GROUPING = Grouping.kind
+VARIABLE = Variable.kind
+LOGICAL = Logical.kind
+ASSIGN = Assign.kind
+
+VAR = Var.kind
+EXPRESSION = Expression.kind
+PRINT = Print.kind
+BLOCK = Block.kind
+IF = If.kind
+WHILE = While.kind
+
+PLUS = TYPE_CODES[tt.PLUS]
+MINUS = TYPE_CODES[tt.MINUS]
+STAR = TYPE_CODES[tt.STAR]
+SLASH = TYPE_CODES[tt.SLASH]
+MODULO = TYPE_CODES[tt.MODULO]
+LESS = TYPE_CODES[tt.LESS]
+LESS_EQUAL = TYPE_CODES[tt.LESS_EQUAL]
+GREATER = TYPE_CODES[tt.GREATER]
+GREATER_EQUAL = TYPE_CODES[tt.GREATER_EQUAL]
+EQUAL_EQUAL = TYPE_CODES[tt.EQUAL_EQUAL]
+BANG_EQUAL = TYPE_CODES[tt.BANG_EQUAL]
+OR = TYPE_CODES[tt.OR]
+
+
+class ArenaInterpreter(Interpreter):
+    """
+    Walks an Arena instead of the tree, dispatching on
+    the node kinds and reading children out of the arrays.
+
+    Number and string operations are done inline, anything
+    else (type errors, division by 0, mixed operands) goes
+    through the tree-walker's evaluate_binary/evaluate_unary
+    on a node built for the occasion, so errors and edge
+    cases are exactly the tree-walker's.
+    """
+
+    @classmethod
+    def compile_program(cls, stmts: list[Stmt]):
+        return Arena.from_tree(stmts)
+
+    def execute_compiled(self, arena: Arena):
+        self.execute_arena(arena)
+
+    def interpret_arena(self, arena: Arena):
+        try:
+            self.execute_arena(arena)
+
+        except LoxRuntimeError as error:
+            lox.Lox.runtime_error(error)
+
+    def execute_arena(self, arena: Arena):
+        self.arena = arena
+        self.kinds = arena.kinds
+        self.a = arena.a
+        self.b = arena.b
+        self.c = arena.c
+        self.tokens = arena.tokens
+        self.children = arena.children
+        self.token_types = arena.token_types
+        self.lexemes = arena.lexemes
+        self.token_lexemes = arena.token_lexemes
+        self.literals = arena.literals
+
+        self.execute_list(arena.root_start, arena.root_count)
+
+    def name(self, node: int):
+        return self.lexemes[self.token_lexemes[self.tokens[node]]]
+
+    def execute_list(self, start: int, count: int):
+        execute = self.execute
+        children = self.children
+
+        for index in range(start, start + count):
+            execute(children[index])
+
+    def execute(self, node: int):
+        kind = self.kinds[node]
+
+        if kind == EXPRESSION:
+            self.evaluate(self.a[node])
+
+        elif kind == PRINT:
+            value = self.stringify(self.evaluate(self.a[node]))
+            self.stdout.write(f"{value}\n")
+
+        elif kind == VAR:
+            initializer = self.a[node]
+            value = None if initializer < 0 else self.evaluate(initializer)
+            slot = self.b[node]
+
+            if slot < 0:
+                self.globals.define(self.arena.token(self.tokens[node]),
+                                    value)
+            else:
+                self.environment.values[slot] = value
+
+        elif kind == BLOCK:
+            # Blocks without locals run in the enclosing scope
+            if not self.c[node]:
+                self.execute_list(self.a[node], self.b[node])
+                return
+
+            previous = self.environment
+
+            try:
+                self.environment = Frame(self.c[node], previous)
+                self.execute_list(self.a[node], self.b[node])
+            finally:
+                self.environment = previous
+
+        elif kind == IF:
+            if self.is_truthy(self.evaluate(self.a[node])):
+                self.execute(self.b[node])
+            elif self.c[node] >= 0:
+                self.execute(self.c[node])
+
+        elif kind == WHILE:
+            condition = self.a[node]
+            body = self.b[node]
+            budget = self.budget
+
+            if budget == None:
+                while self.is_truthy(self.evaluate(condition)):
+                    self.execute(body)
+            else:
+                keyword = self.arena.token(self.tokens[node])
+
+                while self.is_truthy(self.evaluate(condition)):
+                    self.execute(body)
+                    budget.step(keyword)
+
+    def evaluate(self, node: int):
+        kind = self.kinds[node]
+
+        if kind == BINARY:
+            right = self.evaluate(self.b[node])
+            left = self.evaluate(self.a[node])
+            op = self.token_types[self.tokens[node]]
+
+            if type(left) is float and type(right) is float:
+                if op == PLUS:
+                    return left + right
+                elif op == MINUS:
+                    return left - right
+                elif op == STAR:
+                    return left * right
+                elif op == SLASH and right != 0:
+                    return left / right
+                elif op == MODULO:
+                    return left % right
+                elif op == LESS:
+                    return left < right
+                elif op == LESS_EQUAL:
+                    return left <= right
+                elif op == GREATER:
+                    return left > right
+                elif op == GREATER_EQUAL:
+                    return left >= right
+
+            if op == EQUAL_EQUAL:
+                return left == right
+            elif op == BANG_EQUAL:
+                return left != right
+
+            return self.evaluate_binary(
+                Binary(None, self.arena.token(self.tokens[node]), None),
+                left, right)
+
+        elif kind == LITERAL:
+            return self.literals[self.a[node]]
+
+        elif kind == VARIABLE:
+            depth = self.a[node]
+
+            if depth < 0:
+                variables = self.globals.variables
+                name = self.name(node)
+
+                if name in variables:
+                    return variables[name]
+
+                return self.globals.get(self.arena.token(self.tokens[node]))
+
+            return self.environment.ancestor(depth).values[self.b[node]]
+
+        elif kind == ASSIGN:
+            value = self.evaluate(self.a[node])
+            depth = self.b[node]
+
+            if depth < 0:
+                self.globals.set(self.arena.token(self.tokens[node]), value)
+            else:
+                self.environment.ancestor(depth).values[self.c[node]] = value
+
+            return value
+
+        elif kind == LOGICAL:
+            left = self.evaluate(self.a[node])
+
+            if self.token_types[self.tokens[node]] == OR:
+                if left is not None and left is not False:
+                    return left
+            elif left is None or left is False:
+                return left
+
+            return self.evaluate(self.b[node])
+
+        elif kind == UNARY:
+            right = self.evaluate(self.a[node])
+
+            if self.token_types[self.tokens[node]] == MINUS \
+                    and type(right) is float:
+                return -right
+
+            return self.evaluate_unary(
+                Unary(self.arena.token(self.tokens[node]), None), right)
+
+        elif kind == GROUPING:
+            return self.evaluate(self.a[node])
+
+        elif kind == CALL:
+            self.evaluate(self.a[node])
@@ -0,0 +1,52 @@
+import time
+from interpreter.lox_runtime_error import LoxRuntimeError
+from scanner.token import Token
+
+# The deadline is only looked at every this many steps,
+# reading the clock costs more than counting
+CLOCK_INTERVAL = 1024
+
+
+class BudgetExceeded(LoxRuntimeError):
+    """
+    Raised when a program runs out of steps or time.
+    `steps` is the number of steps it had taken.
+    """
+
+    def __init__(self, message, token, steps: int) -> None:
+        super().__init__(message, token)
+        self.steps = steps
+
+
+class Budget:
+    """
+    Limits how long a program can run. A step is one iteration
+    of a loop, which every engine charges at the loop's back
+    edge, so straight-line code never pays for it.
+
+    The deadline counts from the creation of the budget, make
+    a new one for every run. `used` is the number of steps
+    taken so far, it never goes past the limit.
+    """
+
+    def __init__(self, steps: int = None, seconds: float = None):
+        self.steps = steps
+        self.seconds = seconds
+        self.used = 0
+
+        self.limit = steps if steps != None else float("inf")
+        self.deadline = time.monotonic() + seconds \
+            if seconds != None else float("inf")
+
+    def step(self, token: Token):
+        # Checked first, a step that is refused was never taken
+        if self.used >= self.limit:
+            raise BudgetExceeded(f"Step budget of {self.steps} "
+                                 f"exhausted", token, self.used)
+
+        self.used += 1
+
+        if self.used % CLOCK_INTERVAL == 0 \
+                and time.monotonic() > self.deadline:
+            raise BudgetExceeded(f"Deadline of {self.seconds}s exceeded",
+                                 token, self.used)
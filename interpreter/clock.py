@@ -1,13 +1,12 @@
 import time
-from interpreter.interpreter import Interpreter
-from parser.expr import LoxCallable
+from parser.stmt import LoxCallable
 
 
 class Clock(LoxCallable):
     def arity(self):
         return 0
 
-    def call(interpreter: Interpreter, arguments: list):
+    def call(self, interpreter, arguments: list):
         return time.time()
 
     def __str__(self) -> str:
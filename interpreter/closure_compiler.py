@@ -0,0 +1,503 @@
+from interpreter.frame import Frame
+from interpreter.interpreter import Interpreter
+from interpreter.lox_runtime_error import LoxRuntimeError
+from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, Unary, ExprVisitor, Grouping, Variable
+from parser.stmt import Block, Expression, ForRange, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token_type import TokenType as tt
+
+# Operators that always produce a bool, so a condition built
+# from them doesn't need to go through is_truthy
+COMPARISONS = {
+    tt.EQUAL_EQUAL, tt.BANG_EQUAL, tt.LESS,
+    tt.LESS_EQUAL, tt.GREATER, tt.GREATER_EQUAL
+}
+
+
+class Globals:
+    """
+    The root of the scopes closures run in, holding what
+    changes from one run to the next: the globals, where
+    print writes and the budget
+    """
+
+    __slots__ = ("environment", "variables", "write", "budget", "globals")
+
+    def __init__(self, interpreter: Interpreter):
+        self.environment = interpreter.globals
+        self.variables = interpreter.globals.variables
+        self.write = interpreter.stdout.write
+        self.budget = interpreter.budget
+
+        # Every scope has one, this is the root's
+        self.globals = self
+
+
+class Scope(Frame):
+    """
+    Frame that keeps the Globals of its run at hand,
+    instead of finding them at the end of `enclosing`
+    """
+
+    __slots__ = ("globals",)
+
+    def __init__(self, size: int, enclosing: "Scope | Globals"):
+        self.values = [None] * size
+        self.enclosing = enclosing
+        self.globals = enclosing.globals
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    """
+    Walks the tree once and turns every node into a Python
+    closure taking the current scope. Operators, scope depths
+    and slots are all decided at compile time, so running the
+    program is just calling the closures.
+
+    Nothing about a run is bound at compile time, closures
+    find it in the Globals every scope points to, so the same
+    closures can be run any number of times.
+
+    Expects the tree to have gone through the resolver.
+    """
+
+    def __init__(self):
+        # stringify and count_limit don't depend on the run
+        self.evaluator = Interpreter()
+
+    def compile(self, node: Expr | Stmt):
+        return node.accept(self)
+
+    def compile_condition(self, expr: Expr):
+        """
+        Compile an expression whose value is only
+        used for its truthiness
+        """
+        condition = self.compile(expr)
+
+        if type(expr) == Binary and expr.op.type in COMPARISONS:
+            return condition
+
+        def truthy(env):
+            value = condition(env)
+            return value is not None and value is not False
+
+        return truthy
+
+    def visit_block_stmt(self, stmt: Block):
+        statements = tuple(self.compile(s) for s in stmt.statements)
+        slots = stmt.slots
+
+        if not slots:
+            def inline_block(env):
+                for statement in statements:
+                    statement(env)
+
+            return inline_block
+
+        def block(env):
+            env = Scope(slots, env)
+
+            for statement in statements:
+                statement(env)
+
+        return block
+
+    def visit_expression_stmt(self, stmt: Expression):
+        return self.compile(stmt.expr)
+
+    def visit_print_stmt(self, stmt: Print):
+        expr = self.compile(stmt.expr)
+        stringify = self.evaluator.stringify
+
+        def print_stmt(env):
+            env.globals.write(f"{stringify(expr(env))}\n")
+
+        return print_stmt
+
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer != None:
+            initializer = self.compile(stmt.initializer)
+        else:
+            def initializer(env):
+                return None
+
+        if stmt.slot == None:
+            name = stmt.name
+
+            def var_global(env):
+                env.globals.environment.define(name, initializer(env))
+
+            return var_global
+
+        slot = stmt.slot
+
+        def var_local(env):
+            env.values[slot] = initializer(env)
+
+        return var_local
+
+    def visit_if_stmt(self, stmt: If):
+        condition = self.compile_condition(stmt.condition)
+        then_branch = self.compile(stmt.thenBranch)
+
+        if stmt.elseBranch == None:
+            def if_stmt(env):
+                if condition(env):
+                    then_branch(env)
+
+            return if_stmt
+
+        else_branch = self.compile(stmt.elseBranch)
+
+        def if_else_stmt(env):
+            if condition(env):
+                then_branch(env)
+            else:
+                else_branch(env)
+
+        return if_else_stmt
+
+    def visit_while_stmt(self, stmt: While):
+        condition = self.compile_condition(stmt.condition)
+        body = self.compile(stmt.body)
+
+        keyword = stmt.keyword
+
+        def while_stmt(env):
+            budget = env.globals.budget
+
+            if budget == None:
+                while condition(env):
+                    body(env)
+            else:
+                while condition(env):
+                    body(env)
+                    budget.step(keyword)
+
+        return while_stmt
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        loop = self.compile(stmt.loop)
+        condition = stmt.loop.condition
+        counter = condition.left
+
+        if counter.depth == None:
+            return loop
+
+        bound = self.compile(condition.right)
+        start = self.compile(counter)
+        body = self.compile(stmt.body)
+
+        op = condition.op
+        count_limit = self.evaluator.count_limit
+        depth = counter.depth
+        slot = counter.slot
+        step = stmt.step
+
+        keyword = stmt.loop.keyword
+
+        def forrange_stmt(env):
+            limit = count_limit(op, bound(env), start(env))
+
+            if limit == None:
+                return loop(env)
+
+            budget = env.globals.budget
+            values = env.ancestor(depth).values
+            value = values[slot]
+
+            if budget == None:
+                while value < limit:
+                    body(env)
+                    value += step
+                    values[slot] = value
+            else:
+                while value < limit:
+                    body(env)
+                    value += step
+                    values[slot] = value
+                    budget.step(keyword)
+
+        return forrange_stmt
+
+    def visit_literal_expr(self, expr: Literal):
+        value = expr.value
+
+        def literal(env):
+            return value
+
+        return literal
+
+    def visit_grouping_expr(self, expr: Grouping):
+        return self.compile(expr.expr)
+
+    def visit_variable_expr(self, expr: Variable):
+        slot = expr.slot
+
+        if expr.depth == None:
+            name = expr.name
+            lexeme = name.lexeme
+
+            def get_global(env):
+                try:
+                    return env.globals.variables[lexeme]
+                except KeyError:
+                    raise LoxRuntimeError(f"Undefined variable "
+                                          f"'{lexeme}'", name)
+
+            return get_global
+
+        elif expr.depth == 0:
+            def get_local(env):
+                return env.values[slot]
+
+            return get_local
+
+        elif expr.depth == 1:
+            def get_enclosing(env):
+                return env.enclosing.values[slot]
+
+            return get_enclosing
+
+        depth = expr.depth
+
+        def get_ancestor(env):
+            return env.ancestor(depth).values[slot]
+
+        return get_ancestor
+
+    def visit_assign_expr(self, expr: Assign):
+        value = self.compile(expr.value)
+        slot = expr.slot
+
+        if expr.depth == None:
+            name = expr.name
+
+            def assign_global(env):
+                val = value(env)
+                env.globals.environment.set(name, val)
+                return val
+
+            return assign_global
+
+        elif expr.depth == 0:
+            def assign_local(env):
+                val = env.values[slot] = value(env)
+                return val
+
+            return assign_local
+
+        depth = expr.depth
+
+        def assign_ancestor(env):
+            val = env.ancestor(depth).values[slot] = value(env)
+            return val
+
+        return assign_ancestor
+
+    def visit_call_expr(self, expr: Call):
+        callee = self.compile(expr.callee)
+
+        def call(env):
+            callee(env)
+
+        return call
+
+    def visit_logical_expr(self, expr: Logical):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+
+        if expr.op.type == tt.OR:
+            def logical_or(env):
+                value = left(env)
+
+                if value is not None and value is not False:
+                    return value
+
+                return right(env)
+
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+
+            if value is None or value is False:
+                return value
+
+            return right(env)
+
+        return logical_and
+
+    def visit_unary_expr(self, expr: Unary):
+        right = self.compile(expr.right)
+        op = expr.op
+
+        if op.type == tt.MINUS:
+            def negate(env):
+                value = right(env)
+
+                if type(value) is not float:
+                    raise LoxRuntimeError("Operand must be a number", op)
+
+                return -value
+
+            return negate
+
+        def bang(env):
+            value = right(env)
+            return value is None or value is False
+
+        return bang
+
+    def visit_binary_expr(self, expr: Binary):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        op = expr.op
+        stringify = self.evaluator.stringify
+
+        # Operands are evaluated right to left,
+        # just like in the tree-walker
+        if op.type == tt.PLUS:
+            def add(env):
+                r = right(env)
+                l = left(env)
+
+                if (type(l) == float and type(r) == float) \
+                        or (type(l) == str and type(r) == str):
+                    return l + r
+
+            return add
+
+        elif op.type == tt.SLASH:
+            def divide(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                if r == 0:
+                    raise LoxRuntimeError(
+                        f"Division by 0 between {stringify(l)} "
+                        f"and {stringify(r)}",
+                        op)
+
+                return l / r
+
+            return divide
+
+        elif op.type == tt.EQUAL_EQUAL:
+            def equal(env):
+                r = right(env)
+                return left(env) == r
+
+            return equal
+
+        elif op.type == tt.BANG_EQUAL:
+            def not_equal(env):
+                r = right(env)
+                return left(env) != r
+
+            return not_equal
+
+        if op.type == tt.MINUS:
+            def subtract(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l - r
+
+            return subtract
+
+        elif op.type == tt.STAR:
+            def multiply(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l * r
+
+            return multiply
+
+        elif op.type == tt.MODULO:
+            def modulo(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l % r
+
+            return modulo
+
+        elif op.type == tt.LESS:
+            def less(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l < r
+
+            return less
+
+        elif op.type == tt.LESS_EQUAL:
+            def less_equal(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l <= r
+
+            return less_equal
+
+        elif op.type == tt.GREATER:
+            def greater(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l > r
+
+            return greater
+
+        elif op.type == tt.GREATER_EQUAL:
+            def greater_equal(env):
+                r = right(env)
+                l = left(env)
+
+                if type(l) is not float or type(r) is not float:
+                    raise LoxRuntimeError("Operands must be numbers", op)
+
+                return l >= r
+
+            return greater_equal
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Interpreter that compiles the program to closures
+    before running it
+    """
+
+    @classmethod
+    def compile_program(cls, stmts: list[Stmt]):
+        compiler = ClosureCompiler()
+        return tuple(compiler.compile(stmt) for stmt in stmts)
+
+    def execute_compiled(self, program: tuple):
+        globals = Globals(self)
+
+        for stmt in program:
+            stmt(globals)
@@ -0,0 +1,20 @@
+class Frame:
+    """
+    Compact scope for a block whose variables were
+    resolved ahead of time. Values live in a fixed-size
+    list indexed by the slot the resolver assigned.
+    """
+
+    __slots__ = ("values", "enclosing")
+
+    def __init__(self, size: int, enclosing=None):
+        self.values = [None] * size
+        self.enclosing = enclosing
+
+    def ancestor(self, distance: int):
+        frame = self
+
+        for _ in range(distance):
+            frame = frame.enclosing
+
+        return frame
@@ -1,31 +1,69 @@
 from interpreter.clock import Clock
 from interpreter.environment import Environment
+from interpreter.frame import Frame
 from interpreter.lox_runtime_error import LoxRuntimeError
-from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, LoxCallable, Unary, ExprVisitor, Grouping, Variable
-from parser.stmt import Block, Expression, Function, If, Print, Stmt, StmtVisitor, Var, While
+from interpreter.quickened import (PolymorphicBinary, PolymorphicUnary,
+                                   quicken_binary, quicken_logical,
+                                   quicken_unary)
+from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, Unary, ExprVisitor, Grouping, Variable
+from parser.stmt import Block, Expression, ForRange, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token import Token
 from scanner.token_type import TokenType as tt
 import lox
+import math
+import sys
 
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self):
+    def __init__(self, stdout=None, budget=None):
         self.globals = Environment()
         self.environment = self.globals
 
-        self.globals.define("clock", Clock())
+        # Where print writes, anything with a write method
+        self.stdout = stdout if stdout != None else sys.stdout
+
+        # Charged on every loop iteration, None for no limits
+        self.budget = budget
+
+        self.globals.define(Token(tt.IDENTIFIER, "clock", None, 0), Clock())
 
     def interpret(self, stmts: list[Stmt]):
         try:
-            for stmt in stmts:
-                self.run(stmt)
+            self.execute_program(stmts)
 
         except LoxRuntimeError as error:
             lox.Lox.runtime_error(error)
 
+    def execute_program(self, stmts: list[Stmt]):
+        """
+        Run a resolved program, letting runtime errors
+        propagate. Engines override the two methods below
+        rather than this or interpret.
+        """
+        self.execute_compiled(self.compile_program(stmts))
+
+    @classmethod
+    def compile_program(cls, stmts: list[Stmt]):
+        """
+        Turn a resolved program into what the engine runs. It
+        only depends on the program, any number of interpreters
+        can run it, one after the other or at the same time.
+        The tree-walker runs the tree itself.
+        """
+        return stmts
+
+    def execute_compiled(self, program):
+        """
+        Run what compile_program returned, with this
+        interpreter's globals, stdout and budget
+        """
+        for stmt in program:
+            self.run(stmt)
+
     def run(self, expr: Expr | Stmt):
         return expr.accept(self)
 
-    def execute_block(self, stmts: list[Stmt], environment: Environment):
+    def execute_block(self, stmts: list[Stmt], environment: Frame):
         previous = self.environment
 
         try:
@@ -37,7 +75,14 @@ class Interpreter(ExprVisitor, StmtVisitor):
             self.environment = previous
 
     def visit_block_stmt(self, expr: Block):
-        self.execute_block(expr.statements, Environment(self.environment))
+        # Blocks without locals run in the enclosing scope
+        if not expr.slots:
+            for stmt in expr.statements:
+                self.run(stmt)
+            return
+
+        self.execute_block(expr.statements,
+                           Frame(expr.slots, self.environment))
 
     def visit_literal_expr(self, expr: Literal):
         return expr.value
@@ -54,14 +99,21 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_unary_expr(self, expr: Unary):
         right = self.run(expr.right)
 
+        if type(expr) is Unary:
+            quicken_unary(expr, right)
+
+        return self.evaluate_unary(expr, right)
+
+    def evaluate_unary(self, expr: Unary, right):
         if expr.op.type == tt.MINUS:
-            self.check_number_operand(right)
+            self.check_number_operand(expr.op, right)
             return -right
 
         elif expr.op.type == tt.BANG:
             return not self.is_truthy(right)
 
     def visit_logical_expr(self, expr: Logical):
+        quicken_logical(expr)
         left = self.run(expr.left)
 
         if expr.op.type == tt.OR:
@@ -77,6 +129,12 @@ class Interpreter(ExprVisitor, StmtVisitor):
         right = self.run(expr.right)
         left = self.run(expr.left)
 
+        if type(expr) is Binary:
+            quicken_binary(expr, left, right)
+
+        return self.evaluate_binary(expr, left, right)
+
+    def evaluate_binary(self, expr: Binary, left, right):
         if expr.op.type == tt.PLUS:
             if (type(left) == float and
                     type(right) == float) \
@@ -99,10 +157,10 @@ class Interpreter(ExprVisitor, StmtVisitor):
             self.check_number_operands(expr.op, left,
                                        right)
 
-            if left == 0:
+            if right == 0:
                 raise LoxRuntimeError(
-                    f"Division by 0 between {self.stringify(right)} "
-                    f"and {self.stringify(left)}",
+                    f"Division by 0 between {self.stringify(left)} "
+                    f"and {self.stringify(right)}",
                     expr.op)
 
             return left / right
@@ -138,11 +196,147 @@ class Interpreter(ExprVisitor, StmtVisitor):
                                        right)
             return left >= right
 
+    # Quickened nodes, see interpreter/quickened.py
+    # Operands are evaluated by calling accept directly to
+    # save a call, and every guard failure deoptimizes the
+    # node for good
+
+    def deoptimize_binary(self, expr: Binary, left, right):
+        expr.__class__ = PolymorphicBinary
+        return self.evaluate_binary(expr, left, right)
+
+    def visit_float_add_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left + right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_subtract_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left - right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_multiply_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left * right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_modulo_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left % right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_less_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left < right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_less_equal_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left <= right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_greater_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left > right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_greater_equal_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float:
+            return left >= right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_float_divide_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is float and type(right) is float and right != 0:
+            return left / right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_string_concat_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        left = expr.left.accept(self)
+
+        if type(left) is str and type(right) is str:
+            return left + right
+
+        return self.deoptimize_binary(expr, left, right)
+
+    def visit_equal_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        return expr.left.accept(self) == right
+
+    def visit_not_equal_expr(self, expr: Binary):
+        right = expr.right.accept(self)
+        return expr.left.accept(self) != right
+
+    def visit_float_negate_expr(self, expr: Unary):
+        right = expr.right.accept(self)
+
+        if type(right) is float:
+            return -right
+
+        expr.__class__ = PolymorphicUnary
+        return self.evaluate_unary(expr, right)
+
+    def visit_not_expr(self, expr: Unary):
+        right = expr.right.accept(self)
+        return right is None or right is False
+
+    def visit_or_expr(self, expr: Logical):
+        left = expr.left.accept(self)
+
+        if left is not None and left is not False:
+            return left
+
+        return expr.right.accept(self)
+
+    def visit_and_expr(self, expr: Logical):
+        left = expr.left.accept(self)
+
+        if left is None or left is False:
+            return left
+
+        return expr.right.accept(self)
+
     def visit_expression_stmt(self, expr: Expression):
         self.run(expr.expr)
 
     def visit_print_stmt(self, expr: Print):
-        print(self.stringify(self.run(expr.expr)))
+        self.stdout.write(f"{self.stringify(self.run(expr.expr))}\n")
 
     def visit_var_stmt(self, expr: Var):
         value = None
@@ -150,15 +344,83 @@ class Interpreter(ExprVisitor, StmtVisitor):
         if expr.initializer != None:
             value = self.run(expr.initializer)
 
-        self.environment.define(expr.name, value)
+        if expr.slot == None:
+            self.globals.define(expr.name, value)
+        else:
+            self.environment.values[expr.slot] = value
 
     def visit_while_stmt(self, expr: While):
-        while(self.is_truthy(self.run(expr.condition))):
-            self.run(expr.body)
+        budget = self.budget
+
+        if budget == None:
+            while(self.is_truthy(self.run(expr.condition))):
+                self.run(expr.body)
+        else:
+            while(self.is_truthy(self.run(expr.condition))):
+                self.run(expr.body)
+                budget.step(expr.keyword)
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        condition = stmt.loop.condition
+        counter = condition.left
+
+        # In the order the loop's condition would read them
+        bound = self.run(condition.right)
+        limit = self.count_limit(condition.op, bound, self.run(counter))
+
+        if limit == None or counter.depth == None:
+            self.run(stmt.loop)
+            return
+
+        values = self.environment.ancestor(counter.depth).values
+        slot = counter.slot
+        value = values[slot]
+        step = stmt.step
+        body = stmt.body
+        budget = self.budget
+
+        if budget == None:
+            while value < limit:
+                self.run(body)
+                value += step
+                values[slot] = value
+        else:
+            keyword = stmt.loop.keyword
+
+            while value < limit:
+                self.run(body)
+                value += step
+                values[slot] = value
+                budget.step(keyword)
+
+    def count_limit(self, op: Token, bound, start):
+        """
+        What a ForRange's counter has to stay below, None when
+        the counter or the bound aren't numbers and the loop has
+        to run as a While to report it.
+
+        value <= bound is value < the float right after bound,
+        but nothing comes after infinity.
+        """
+        if type(bound) != float or type(start) != float:
+            return None
+
+        if op.type == tt.LESS:
+            return bound
+
+        if bound == math.inf:
+            return None
+
+        return math.nextafter(bound, math.inf)
 
-    def visit_assignment_expr(self, expr: Assign):
+    def visit_assign_expr(self, expr: Assign):
         val = self.run(expr.value)
-        self.environment.set(expr.name, val)
+
+        if expr.depth == None:
+            self.globals.set(expr.name, val)
+        else:
+            self.environment.ancestor(expr.depth).values[expr.slot] = val
+
         return val
     
     def visit_call_expr(self, expr: Call):
@@ -166,11 +428,11 @@ class Interpreter(ExprVisitor, StmtVisitor):
         
         arguments = 9
     
-    def visit_function_stmt(self, expr: Function):
-        raise NotImplemented
-
     def visit_variable_expr(self, expr: Variable):
-        return self.environment.get(expr.name)
+        if expr.depth == None:
+            return self.globals.get(expr.name)
+
+        return self.environment.ancestor(expr.depth).values[expr.slot]
 
     def is_truthy(self, object) -> bool:
         """
@@ -198,8 +460,8 @@ class Interpreter(ExprVisitor, StmtVisitor):
             return obj
 
     def check_number_operand(self, operator, operand):
-        if type(operand.value) != float:
-            raise LoxRuntimeError(operator, "Operand must be a number")
+        if type(operand) != float:
+            raise LoxRuntimeError("Operand must be a number", operator)
 
     def check_number_operands(self, operator, left: Expr, right: Expr):
         if type(left) != float \
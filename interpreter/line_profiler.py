@@ -0,0 +1,152 @@
+from collections import Counter
+from dataclasses import fields
+import sys
+import time
+from interpreter.interpreter import Interpreter
+from parser.expr import Expr
+from parser.stmt import Stmt
+from scanner.token import Token
+
+
+def first_line(node: Expr | Stmt):
+    """
+    Smallest line of the tokens in the subtree, None when it
+    has no tokens at all (a literal, or an empty block)
+    """
+    lines = []
+    stack = [node]
+
+    while stack:
+        node = stack.pop()
+
+        for field in fields(node):
+            value = getattr(node, field.name)
+
+            if type(value) == Token:
+                lines.append(value.line)
+            elif isinstance(value, (Expr, Stmt)):
+                stack.append(value)
+            elif type(value) == list:
+                stack.extend(value)
+
+    return min(lines, default=None)
+
+
+def statement_lines(stmts: list[Stmt], lines: dict = None, previous=1):
+    """
+    Map the id of every statement to its line. Statements
+    without tokens get the line of the statement before them.
+    """
+    if lines == None:
+        lines = {}
+
+    for stmt in stmts:
+        line = first_line(stmt) or previous
+        lines[id(stmt)] = line
+        previous = line
+
+        for field in fields(stmt):
+            value = getattr(stmt, field.name)
+
+            if isinstance(value, Stmt):
+                previous = statement_lines([value], lines, previous)
+            elif type(value) == list and value \
+                    and isinstance(value[0], Stmt):
+                previous = statement_lines(value, lines, previous)
+
+    return previous
+
+
+class LineProfiler(Interpreter):
+    """
+    Tree-walker that attributes time and execution counts to
+    the source lines of the statements it runs.
+
+    Every statement is timed; its self time is that time minus
+    the time of the statements nested in it (a loop's body, a
+    block's statements). Expressions aren't timed on their own,
+    they count toward the statement they're in.
+    """
+
+    def __init__(self, stdout=None, budget=None):
+        super().__init__(stdout, budget)
+        self.lines: dict[int, int] = {}
+
+        self.counts = Counter()
+        self.self_time = Counter()
+        self.total_time = Counter()
+
+        # Self time by stack of lines, for collapsed stacks
+        self.stacks = Counter()
+
+        # Lines of the statements being run, and the time
+        # spent in the statements nested in each of them
+        self.stack: list[int] = []
+        self.nested: list[float] = []
+
+    def execute_program(self, stmts: list[Stmt]):
+        statement_lines(stmts, self.lines)
+        super().execute_program(stmts)
+
+    def run(self, node: Expr | Stmt):
+        line = self.lines.get(id(node))
+
+        if line == None:
+            return node.accept(self)
+
+        self.stack.append(line)
+        self.nested.append(0.0)
+        start = time.perf_counter()
+
+        try:
+            return node.accept(self)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self.nested.pop()
+
+            self.stacks[tuple(self.stack)] += own
+            self.stack.pop()
+
+            self.counts[line] += 1
+            self.self_time[line] += own
+
+            # A line nested in itself, like a loop and its body
+            # written on one line, only counts its time once
+            if line not in self.stack:
+                self.total_time[line] += elapsed
+
+            if self.nested:
+                self.nested[-1] += elapsed
+
+    def report(self, source: str, limit: int = 20, file=sys.stderr):
+        """
+        Print the lines that took the most self time
+        """
+        source_lines = source.splitlines()
+        total = sum(self.self_time.values()) or 1
+
+        print("== hot lines ==", file=file)
+        print(f"{'line':>6} {'count':>10} {'self':>11} {'total':>11} "
+              f"{'%':>6}  source", file=file)
+
+        for line, own in self.self_time.most_common(limit):
+            text = source_lines[line - 1].strip() \
+                if line <= len(source_lines) else ""
+
+            print(f"{line:>6} {self.counts[line]:>10} "
+                  f"{own * 1000:>9.2f}ms "
+                  f"{self.total_time[line] * 1000:>9.2f}ms "
+                  f"{own / total * 100:>5.1f}%  {text}", file=file)
+
+    def write_collapsed(self, path: str, name: str = "<script>"):
+        """
+        Write the self time of every stack of lines in the
+        collapsed format flamegraph tools read, in microseconds
+        """
+        with open(path, "w") as file:
+            for stack, own in sorted(self.stacks.items()):
+                weight = round(own * 1_000_000)
+
+                if weight:
+                    frames = ";".join(f"{name}:{line}" for line in stack)
+                    file.write(f"{frames} {weight}\n")
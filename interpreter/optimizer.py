@@ -0,0 +1,358 @@
+from dataclasses import fields
+from interpreter.interpreter import Interpreter
+from interpreter.lox_runtime_error import LoxRuntimeError
+from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, Unary, ExprVisitor, Grouping, Variable
+from parser.stmt import dispatch_table, Block, Expression, ForRange, Function, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token_type import TokenType as tt
+
+# Kinds of expressions the optimizer never rewrites
+LEAVES = (Literal.kind, Variable.kind)
+
+# Kinds with a left and a right operand
+BINARY = (Binary.kind, Logical.kind)
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    """
+    Rewrites the tree before it is resolved:
+
+    - folds operators whose operands are all literals
+    - strips Grouping wrappers
+    - drops If branches and While loops with constant conditions
+    - splices blocks that don't declare anything into their parent,
+      which flattens the Block([body, Expression(increment)]) that
+      for loops desugar into
+    - turns counted loops, like for (var i = 0; i < n; i = i + 1),
+      into ForRange so engines can count in Python
+
+    Folding uses the tree-walker itself, so folded values are
+    exactly what running the code would produce. Operations
+    that would raise an error are left alone for the runtime
+    to report.
+
+    Statement visitors return the replacement statement,
+    or None when the statement can be dropped. Expression
+    visitors get their operands already rewritten, see
+    optimize_expr.
+    """
+
+    def __init__(self):
+        self.evaluator = Interpreter()
+        self.table = dispatch_table(self)
+
+    def optimize(self, stmts: list[Stmt]) -> list[Stmt]:
+        return self.optimize_statements(stmts)
+
+    def run(self, stmt: Stmt):
+        return self.table[stmt.kind](stmt)
+
+    def optimize_statements(self, stmts: list[Stmt]) -> list[Stmt]:
+        optimized = []
+
+        for stmt in stmts:
+            stmt = self.run(stmt)
+
+            if stmt == None:
+                continue
+
+            # A block without declarations doesn't scope anything,
+            # so its statements can run in the enclosing block
+            if type(stmt) == Block and not self.declares(stmt):
+                optimized.extend(stmt.statements)
+            else:
+                optimized.append(stmt)
+
+        return optimized
+
+    def declares(self, block: Block):
+        return any(type(stmt) in (Var, Function) for stmt in block.statements)
+
+    def fold(self, expr: Binary | Unary):
+        """
+        Evaluate an operator whose operands are literals,
+        returns the expression untouched if it fails
+        """
+        try:
+            if type(expr) == Unary:
+                value = self.evaluator.evaluate_unary(expr, expr.right.value)
+            else:
+                value = self.evaluator.evaluate_binary(expr, expr.left.value,
+                                                       expr.right.value)
+        except (LoxRuntimeError, ZeroDivisionError):
+            # % by 0 isn't a Lox error yet, leave it to the runtime
+            return expr
+
+        return Literal(value)
+
+    def visit_block_stmt(self, stmt: Block):
+        stmt.statements = self.optimize_statements(stmt.statements)
+        return stmt
+
+    def visit_expression_stmt(self, stmt: Expression):
+        stmt.expr = self.optimize_expr(stmt.expr)
+
+        if type(stmt.expr) == Literal:
+            return None
+
+        return stmt
+
+    def visit_print_stmt(self, stmt: Print):
+        stmt.expr = self.optimize_expr(stmt.expr)
+        return stmt
+
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer != None:
+            stmt.initializer = self.optimize_expr(stmt.initializer)
+
+        return stmt
+
+    def visit_if_stmt(self, stmt: If):
+        stmt.condition = self.optimize_expr(stmt.condition)
+        stmt.thenBranch = self.run(stmt.thenBranch)
+
+        if stmt.elseBranch != None:
+            stmt.elseBranch = self.run(stmt.elseBranch)
+
+        if type(stmt.condition) != Literal:
+            if stmt.thenBranch == None:
+                stmt.thenBranch = Block([])
+
+            return stmt
+
+        if self.evaluator.is_truthy(stmt.condition.value):
+            return stmt.thenBranch
+
+        return stmt.elseBranch
+
+    def visit_while_stmt(self, stmt: While):
+        stmt.condition = self.optimize_expr(stmt.condition)
+
+        if type(stmt.condition) == Literal \
+                and not self.evaluator.is_truthy(stmt.condition.value):
+            return None
+
+        stmt.body = self.run(stmt.body) or Block([])
+        return self.count_loop(stmt)
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        return stmt
+
+    def count_loop(self, stmt: While):
+        """
+        Turn a loop shaped like
+
+            while (i < n) { ...; i = i + step; }
+
+        into a ForRange, where the comparison can also be `<=`,
+        n is a number or a variable, step is a number and nothing
+        else in the loop assigns i or n. Returns the loop
+        untouched otherwise.
+
+        Whether i and n hold numbers is only known when running,
+        engines fall back to the While when they don't.
+        """
+        condition = stmt.condition
+
+        if type(condition) != Binary \
+                or condition.op.type not in (tt.LESS, tt.LESS_EQUAL) \
+                or type(condition.left) != Variable:
+            return stmt
+
+        name = condition.left.name.lexeme
+        names = {name}
+        bound = condition.right
+
+        if type(bound) == Variable:
+            if bound.name.lexeme == name:
+                return stmt
+
+            names.add(bound.name.lexeme)
+        elif type(bound) != Literal or type(bound.value) != float:
+            return stmt
+
+        if type(stmt.body) != Block or not stmt.body.statements:
+            return stmt
+
+        *statements, increment = stmt.body.statements
+        step = self.loop_step(increment, name)
+
+        if step == None:
+            return stmt
+
+        # The increment moves out of the body's scope,
+        # it mustn't be using a variable declared there
+        for declaration in statements:
+            if type(declaration) in (Var, Function) \
+                    and declaration.name.lexeme == name:
+                return stmt
+
+        body = Block(statements)
+
+        if self.assigns(body, names):
+            return stmt
+
+        # The While keeps its block, the one engines fall back
+        # to, body shares its statements without the increment
+        return ForRange(stmt, body, step)
+
+    def loop_step(self, stmt: Stmt, name: str):
+        """
+        What `i = i + step` or `i = i - step` adds to i,
+        None for any other statement
+        """
+        if type(stmt) != Expression or type(stmt.expr) != Assign \
+                or stmt.expr.name.lexeme != name:
+            return None
+
+        value = stmt.expr.value
+
+        if type(value) != Binary or type(value.left) != Variable \
+                or value.left.name.lexeme != name \
+                or type(value.right) != Literal \
+                or type(value.right.value) != float:
+            return None
+
+        if value.op.type == tt.PLUS:
+            return value.right.value
+
+        if value.op.type == tt.MINUS:
+            return -value.right.value
+
+        return None
+
+    def assigns(self, node: Stmt, names: set[str]):
+        """
+        Whether anything in the subtree assigns one of `names`
+        """
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+
+            if type(node) == Assign and node.name.lexeme in names:
+                return True
+
+            for field in fields(node):
+                value = getattr(node, field.name)
+
+                if isinstance(value, (Expr, Stmt)):
+                    stack.append(value)
+                elif type(value) == list:
+                    stack.extend(value)
+
+        return False
+
+    def visit_function_stmt(self, stmt: Function):
+        return stmt
+
+    def optimize_expr(self, expr: Expr):
+        """
+        Expressions can nest far deeper than statements, so they
+        are walked with a stack rather than recursion, like in the
+        Resolver. Every expression comes off the stack twice: first
+        to push its operands, then to be rewritten once they have
+        been. Rewritten operands wait on `values`, expression
+        visitors pop theirs and return the replacement.
+        """
+        stack = [(expr, False)]
+        push = stack.append
+        values = []
+        table = self.table
+
+        while stack:
+            expr, ready = stack.pop()
+            kind = expr.kind
+
+            if ready:
+                values.append(table[kind](expr, values))
+                continue
+
+            # Leaves stay as they are
+            if kind in LEAVES:
+                values.append(expr)
+                continue
+
+            if kind in BINARY:
+                left = expr.left
+                right = expr.right
+
+                # Most operators only have leaves under them,
+                # rewrite those without a round trip on the stack
+                if left.kind in LEAVES and right.kind in LEAVES:
+                    values.append(left)
+                    values.append(right)
+                    values.append(table[kind](expr, values))
+                    continue
+
+                push((expr, True))
+                push((right, False))
+                push((left, False))
+                continue
+
+            push((expr, True))
+
+            if kind == Unary.kind:
+                push((expr.right, False))
+            elif kind == Grouping.kind:
+                push((expr.expr, False))
+            elif kind == Assign.kind:
+                push((expr.value, False))
+            elif kind == Call.kind:
+                # Pushed last to first, so they're rewritten in order
+                stack.extend((argument, False)
+                             for argument in reversed(expr.arguments))
+                push((expr.callee, False))
+
+        return values.pop()
+
+    def visit_literal_expr(self, expr: Literal, values: list):
+        return expr
+
+    def visit_grouping_expr(self, expr: Grouping, values: list):
+        return values.pop()
+
+    def visit_variable_expr(self, expr: Variable, values: list):
+        return expr
+
+    def visit_assign_expr(self, expr: Assign, values: list):
+        expr.value = values.pop()
+        return expr
+
+    def visit_call_expr(self, expr: Call, values: list):
+        count = len(expr.arguments)
+        expr.arguments = values[len(values) - count:]
+        del values[len(values) - count:]
+        expr.callee = values.pop()
+        return expr
+
+    def visit_unary_expr(self, expr: Unary, values: list):
+        expr.right = values.pop()
+
+        if type(expr.right) == Literal:
+            return self.fold(expr)
+
+        return expr
+
+    def visit_binary_expr(self, expr: Binary, values: list):
+        expr.right = values.pop()
+        expr.left = values.pop()
+
+        if type(expr.left) == Literal and type(expr.right) == Literal:
+            return self.fold(expr)
+
+        return expr
+
+    def visit_logical_expr(self, expr: Logical, values: list):
+        expr.right = values.pop()
+        expr.left = values.pop()
+
+        if type(expr.left) != Literal:
+            return expr
+
+        truthy = self.evaluator.is_truthy(expr.left.value)
+
+        if expr.op.type == tt.OR:
+            return expr.left if truthy else expr.right
+
+        return expr.right if truthy else expr.left
+
@@ -0,0 +1,67 @@
+import io
+import sys
+
+# Characters held before they are written out
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class Output:
+    """
+    Sink for everything a program prints. Writes are collected
+    in memory and handed to `stream` in chunks of about
+    `buffer_size` characters, so a program printing one line at
+    a time doesn't make a system call per line. A buffer size
+    of 0 writes everything through as it comes.
+
+    Without a stream, chunks go to whatever sys.stdout is when
+    they are written, so redirect_stdout still applies. Nothing
+    reaches the stream before a flush, whoever runs the program
+    flushes once it's done or has failed.
+    """
+
+    def __init__(self, stream=None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+
+        self.chunks: list[str] = []
+        self.size = 0
+
+    @classmethod
+    def capture(self, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Output kept in memory, read it back with getvalue()
+        """
+        return self(io.StringIO(), buffer_size)
+
+    def write(self, text: str):
+        self.chunks.append(text)
+        self.size += len(text)
+
+        if self.size >= self.buffer_size:
+            self.drain()
+
+        return len(text)
+
+    def drain(self):
+        """
+        Hand the buffered chunks to the stream as one write
+        """
+        if self.chunks:
+            stream = self.stream if self.stream != None else sys.stdout
+            stream.write("".join(self.chunks))
+
+            self.chunks.clear()
+            self.size = 0
+
+    def flush(self):
+        self.drain()
+
+        stream = self.stream if self.stream != None else sys.stdout
+        stream.flush()
+
+    def getvalue(self):
+        """
+        Everything written so far, for captured output
+        """
+        self.drain()
+        return self.stream.getvalue()
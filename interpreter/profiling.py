@@ -0,0 +1,184 @@
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import fields
+import sys
+import time
+import tracemalloc
+from interpreter import arena_interpreter, closure_compiler, interpreter, \
+    stack_interpreter
+from interpreter.environment import Environment
+from interpreter.frame import Frame
+from parser.expr import Expr
+from parser.stmt import Stmt
+
+# Modules creating scopes, and the name they create them with
+SCOPE_MODULES = (
+    (interpreter, "Frame"),
+    (interpreter, "Environment"),
+    (closure_compiler, "Frame"),
+    (arena_interpreter, "Frame"),
+    (stack_interpreter, "Frame"),
+)
+
+
+class CountingFrame(Frame):
+    __slots__ = ()
+
+    created = 0
+
+    def __init__(self, size: int, enclosing=None):
+        CountingFrame.created += 1
+        Frame.__init__(self, size, enclosing)
+
+
+class CountingEnvironment(Environment):
+    created = 0
+
+    def __init__(self, enclosing=None):
+        CountingEnvironment.created += 1
+        Environment.__init__(self, enclosing)
+
+
+COUNTING = {"Frame": CountingFrame, "Environment": CountingEnvironment}
+
+# Node class names by kind, for arenas
+KIND_NAMES = {node.kind: node.__name__
+              for node in Expr.__subclasses__() + Stmt.__subclasses__()}
+
+
+class PhaseProfile:
+    """
+    Collects what --profile reports: wall and CPU time of every
+    phase, tokens, nodes by kind and scopes created. With memory,
+    peak memory too, tracing allocations slows every phase down
+    so their times are then labelled as traced.
+
+    Nothing is instrumented while running unless a profile is
+    active: scopes are counted by swapping counting subclasses
+    into the engine modules for the duration of the run.
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+
+        # Phase name -> (wall seconds, cpu seconds), in order
+        self.phases: dict[str, tuple[float, float]] = {}
+        self.tokens = None
+        self.nodes = Counter()
+        self.frames = 0
+        self.environments = 0
+        self.cached = False
+
+    def start(self):
+        if self.memory:
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - wall,
+                                 time.process_time() - cpu)
+
+    @contextmanager
+    def counting_scopes(self):
+        CountingFrame.created = 0
+        CountingEnvironment.created = 0
+
+        for module, name in SCOPE_MODULES:
+            setattr(module, name, COUNTING[name])
+
+        try:
+            yield
+        finally:
+            for module, name in SCOPE_MODULES:
+                setattr(module, name, COUNTING[name].__base__)
+
+            self.frames = CountingFrame.created
+            self.environments = CountingEnvironment.created
+
+    def count_tokens(self, tokens):
+        self.tokens = len(tokens)
+
+    def count_nodes(self, tree: list[Stmt]):
+        stack = list(tree)
+
+        while stack:
+            node = stack.pop()
+            self.nodes[type(node).__name__] += 1
+
+            for field in fields(node):
+                value = getattr(node, field.name)
+
+                if isinstance(value, (Expr, Stmt)):
+                    stack.append(value)
+                elif type(value) == list:
+                    stack.extend(value)
+
+    def count_arena(self, arena):
+        self.nodes.update(KIND_NAMES[kind] for kind in arena.kinds)
+
+    def report(self, file=sys.stderr):
+        if self.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print("== profile ==", file=file)
+
+        if self.memory:
+            print("times include tracing allocations", file=file)
+
+        print(f"{'phase':<10} {'wall':>10} {'cpu':>10}", file=file)
+
+        for name, (wall, cpu) in self.phases.items():
+            print(f"{name:<10} {wall * 1000:>8.2f}ms {cpu * 1000:>8.2f}ms",
+                  file=file)
+
+        if self.cached:
+            print("scanning and parsing skipped, program was cached",
+                  file=file)
+
+        if self.tokens != None:
+            print(f"tokens       {self.tokens}", file=file)
+
+        print(f"nodes        {sum(self.nodes.values())}", file=file)
+
+        for kind, count in self.nodes.most_common():
+            print(f"  {kind:<11}{count}", file=file)
+
+        print(f"frames       {self.frames}", file=file)
+        print(f"environments {self.environments}", file=file)
+
+        if self.memory:
+            print(f"peak memory  {peak / 1024:.1f} KiB", file=file)
+
+
+class NoProfile:
+    """
+    Stands in for PhaseProfile when --profile is off
+    """
+
+    def start(self):
+        pass
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def counting_scopes(self):
+        return nullcontext()
+
+    def count_tokens(self, tokens):
+        pass
+
+    def count_nodes(self, tree: list[Stmt]):
+        pass
+
+    def count_arena(self, arena):
+        pass
+
+    def report(self, file=sys.stderr):
+        pass
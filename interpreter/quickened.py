@@ -0,0 +1,168 @@
+from parser.expr import Binary, Logical, Unary
+from scanner.token_type import TokenType as tt
+
+# Specialized variants the Interpreter rewrites nodes into
+# once it has seen the types of their operands. Rewriting
+# swaps the node's __class__, so the subclasses can't add
+# any state of their own.
+#
+# Only the Interpreter knows how to run these. Each one
+# guards its assumption and falls back to a Polymorphic
+# variant, which is never quickened again.
+
+
+class FloatAdd(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_add_expr(self)
+
+
+class FloatSubtract(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_subtract_expr(self)
+
+
+class FloatMultiply(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_multiply_expr(self)
+
+
+class FloatDivide(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_divide_expr(self)
+
+
+class FloatModulo(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_modulo_expr(self)
+
+
+class FloatLess(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_less_expr(self)
+
+
+class FloatLessEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_less_equal_expr(self)
+
+
+class FloatGreater(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_greater_expr(self)
+
+
+class FloatGreaterEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_greater_equal_expr(self)
+
+
+class StringConcat(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_string_concat_expr(self)
+
+
+class Equal(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_equal_expr(self)
+
+
+class NotEqual(Binary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_not_equal_expr(self)
+
+
+class PolymorphicBinary(Binary):
+    __slots__ = ()
+
+
+class FloatNegate(Unary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_float_negate_expr(self)
+
+
+class Not(Unary):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_not_expr(self)
+
+
+class PolymorphicUnary(Unary):
+    __slots__ = ()
+
+
+class Or(Logical):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_or_expr(self)
+
+
+class And(Logical):
+    __slots__ = ()
+
+    def accept(self, visitor):
+        return visitor.visit_and_expr(self)
+
+
+FLOAT_BINARY = {
+    tt.PLUS: FloatAdd,
+    tt.MINUS: FloatSubtract,
+    tt.STAR: FloatMultiply,
+    tt.SLASH: FloatDivide,
+    tt.MODULO: FloatModulo,
+    tt.LESS: FloatLess,
+    tt.LESS_EQUAL: FloatLessEqual,
+    tt.GREATER: FloatGreater,
+    tt.GREATER_EQUAL: FloatGreaterEqual,
+}
+
+
+def quicken_binary(expr: Binary, left, right):
+    op = expr.op.type
+
+    if op == tt.EQUAL_EQUAL:
+        expr.__class__ = Equal
+    elif op == tt.BANG_EQUAL:
+        expr.__class__ = NotEqual
+    elif type(left) is float and type(right) is float:
+        expr.__class__ = FLOAT_BINARY[op]
+    elif op == tt.PLUS and type(left) is str and type(right) is str:
+        expr.__class__ = StringConcat
+
+
+def quicken_unary(expr: Unary, right):
+    if expr.op.type == tt.BANG:
+        expr.__class__ = Not
+    elif type(right) is float:
+        expr.__class__ = FloatNegate
+
+
+def quicken_logical(expr: Logical):
+    expr.__class__ = Or if expr.op.type == tt.OR else And
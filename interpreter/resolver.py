@@ -0,0 +1,171 @@
+from parser.expr import Assign, Binary, Call, Expr, Grouping, Literal, Logical, Unary, ExprVisitor, Variable
+from parser.stmt import dispatch_table, Block, Expression, ForRange, Function, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token import Token
+import lox
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    """
+    Static pass that runs between the parser and the interpreter.
+
+    Every local variable is bound to a (depth, slot) address:
+    depth is the number of scopes between the use and the
+    declaration, slot is the position of the declaration inside
+    its scope. Variables that aren't found in any scope are
+    globals and keep depth None. Blocks that declare nothing
+    don't count as scopes, and get 0 slots.
+    """
+
+    def __init__(self, reporter=None):
+        # Where errors go, anything with Lox's report and error
+        self.reporter = reporter if reporter != None else lox.Lox
+
+        # One dict per enclosing block, mapping a name
+        # to its slot and whether it has been initialized
+        self.scopes: list[dict[str, tuple[int, bool]]] = []
+
+        self.table = dispatch_table(self)
+
+    def resolve(self, stmts: list[Stmt]):
+        for stmt in stmts:
+            self.run(stmt)
+
+    def run(self, node: Expr | Stmt):
+        return self.table[node.kind](node)
+
+    def resolve_expr(self, expr: Expr):
+        """
+        Expressions can nest far deeper than statements, so they
+        are walked with a stack rather than recursion: expression
+        visitors return the sub-expressions left to resolve
+        """
+        stack = [expr]
+
+        while stack:
+            expr = stack.pop()
+            stack.extend(reversed(self.table[expr.kind](expr)))
+
+    def begin_scope(self):
+        self.scopes.append({})
+
+    def end_scope(self):
+        return len(self.scopes.pop())
+
+    def declare(self, name: Token):
+        """
+        Reserve the next slot of the innermost scope for `name`
+        Returns the slot, or None for globals
+        """
+        if not self.scopes:
+            return None
+
+        scope = self.scopes[-1]
+
+        if name.lexeme in scope:
+            self.reporter.error(name,
+                                "Already a variable with this name in this scope")
+
+        slot = len(scope)
+        scope[name.lexeme] = (slot, False)
+        return slot
+
+    def define(self, name: Token):
+        if not self.scopes:
+            return
+
+        scope = self.scopes[-1]
+        slot, _ = scope[name.lexeme]
+        scope[name.lexeme] = (slot, True)
+
+    def resolve_local(self, expr: Variable | Assign, name: Token):
+        for depth, scope in enumerate(reversed(self.scopes)):
+            if name.lexeme in scope:
+                expr.depth = depth
+                expr.slot = scope[name.lexeme][0]
+                return
+
+    def declares(self, block: Block):
+        return any(type(stmt) in (Var, Function) for stmt in block.statements)
+
+    def visit_block_stmt(self, stmt: Block):
+        # A block without declarations of its own has nothing to
+        # scope: its statements resolve as if they were in the
+        # enclosing block, and engines run it without a new scope.
+        # For loop bodies, Block([body, increment]), are like that.
+        if not self.declares(stmt):
+            self.resolve(stmt.statements)
+            stmt.slots = 0
+            return
+
+        self.begin_scope()
+        self.resolve(stmt.statements)
+        stmt.slots = self.end_scope()
+
+    def visit_var_stmt(self, stmt: Var):
+        stmt.slot = self.declare(stmt.name)
+
+        if stmt.initializer != None:
+            self.resolve_expr(stmt.initializer)
+
+        self.define(stmt.name)
+
+    def visit_function_stmt(self, stmt: Function):
+        self.declare(stmt.name)
+        self.define(stmt.name)
+
+    def visit_expression_stmt(self, stmt: Expression):
+        self.resolve_expr(stmt.expr)
+
+    def visit_print_stmt(self, stmt: Print):
+        self.resolve_expr(stmt.expr)
+
+    def visit_if_stmt(self, stmt: If):
+        self.resolve_expr(stmt.condition)
+        self.run(stmt.thenBranch)
+
+        if stmt.elseBranch != None:
+            self.run(stmt.elseBranch)
+
+    def visit_while_stmt(self, stmt: While):
+        self.resolve_expr(stmt.condition)
+        self.run(stmt.body)
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        # The body is the loop's block without the increment,
+        # which declares nothing: resolving the loop resolves
+        # the body's statements, in a scope of the same size
+        self.run(stmt.loop)
+        stmt.body.slots = stmt.loop.body.slots
+
+    def visit_variable_expr(self, expr: Variable):
+        if self.scopes:
+            declared = self.scopes[-1].get(expr.name.lexeme)
+
+            if declared != None and not declared[1]:
+                self.reporter.error(expr.name, "Can't read local variable "
+                                               "in its own initializer")
+
+        self.resolve_local(expr, expr.name)
+        return ()
+
+    def visit_assign_expr(self, expr: Assign):
+        self.resolve_local(expr, expr.name)
+        return (expr.value,)
+
+    def visit_binary_expr(self, expr: Binary):
+        return (expr.left, expr.right)
+
+    def visit_logical_expr(self, expr: Logical):
+        return (expr.left, expr.right)
+
+    def visit_unary_expr(self, expr: Unary):
+        return (expr.right,)
+
+    def visit_grouping_expr(self, expr: Grouping):
+        return (expr.expr,)
+
+    def visit_literal_expr(self, expr: Literal):
+        return ()
+
+    def visit_call_expr(self, expr: Call):
+        return (expr.callee, *expr.arguments)
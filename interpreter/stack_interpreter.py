@@ -0,0 +1,186 @@
+from interpreter.frame import Frame
+from interpreter.interpreter import Interpreter
+from parser.expr import Assign, Binary, Call, Literal, Logical, Unary, Grouping, Variable
+from parser.stmt import Block, Expression, ForRange, If, Print, Stmt, Var, While
+from scanner.token_type import TokenType as tt
+
+# Work items, what to do with the node next to them.
+# EXECUTE and EVALUATE start on a node, the others finish
+# a node once its children have been evaluated.
+(EXECUTE, EVALUATE, BINARY, UNARY, LOGICAL, ASSIGN, CALL, DISCARD,
+ PRINT, VAR, BRANCH, LOOP, STEP, LEAVE) = range(14)
+
+
+class StackInterpreter(Interpreter):
+    """
+    Tree-walker driven by an explicit work stack instead of
+    Python recursion, so programs can nest statements and
+    expressions as deep as memory allows.
+
+    Work items are (action, node) pairs. Starting on a node
+    pushes the work for its children and an item finishing it
+    below them; values go on a separate value stack. Operands
+    are still evaluated right then left.
+    """
+
+    def execute_compiled(self, stmts: list[Stmt]):
+        previous = self.environment
+
+        try:
+            self.work([(EXECUTE, stmt) for stmt in reversed(stmts)])
+        finally:
+            self.environment = previous
+
+    def work(self, stack: list):
+        values = []
+        push = stack.append
+        budget = self.budget
+
+        while stack:
+            action, node = stack.pop()
+
+            if action == EVALUATE:
+                kind = node.kind
+
+                if kind == Literal.kind:
+                    values.append(node.value)
+
+                elif kind == Variable.kind:
+                    values.append(self.visit_variable_expr(node))
+
+                elif kind == Binary.kind:
+                    push((BINARY, node))
+                    push((EVALUATE, node.left))
+                    push((EVALUATE, node.right))
+
+                elif kind == Grouping.kind:
+                    push((EVALUATE, node.expr))
+
+                elif kind == Unary.kind:
+                    push((UNARY, node))
+                    push((EVALUATE, node.right))
+
+                elif kind == Logical.kind:
+                    push((LOGICAL, node))
+                    push((EVALUATE, node.left))
+
+                elif kind == Assign.kind:
+                    push((ASSIGN, node))
+                    push((EVALUATE, node.value))
+
+                elif kind == Call.kind:
+                    push((CALL, node))
+                    push((EVALUATE, node.callee))
+
+            elif action == EXECUTE:
+                kind = node.kind
+
+                if kind == Expression.kind:
+                    push((DISCARD, node))
+                    push((EVALUATE, node.expr))
+
+                elif kind == Print.kind:
+                    push((PRINT, node))
+                    push((EVALUATE, node.expr))
+
+                elif kind == Var.kind:
+                    push((VAR, node))
+
+                    if node.initializer != None:
+                        push((EVALUATE, node.initializer))
+                    else:
+                        values.append(None)
+
+                elif kind == Block.kind:
+                    # Blocks without locals run in the enclosing scope
+                    if node.slots:
+                        push((LEAVE, self.environment))
+                        self.environment = Frame(node.slots,
+                                                 self.environment)
+
+                    stack.extend((EXECUTE, stmt)
+                                 for stmt in reversed(node.statements))
+
+                elif kind == If.kind:
+                    push((BRANCH, node))
+                    push((EVALUATE, node.condition))
+
+                elif kind == While.kind:
+                    push((LOOP, node))
+                    push((EVALUATE, node.condition))
+
+                elif kind == ForRange.kind:
+                    # Counted loops run as the loop they came from
+                    push((EXECUTE, node.loop))
+
+            elif action == BINARY:
+                left = values.pop()
+                right = values.pop()
+                values.append(self.evaluate_binary(node, left, right))
+
+            elif action == UNARY:
+                values.append(self.evaluate_unary(node, values.pop()))
+
+            elif action == LOGICAL:
+                left = values[-1]
+
+                if node.op.type == tt.OR:
+                    done = self.is_truthy(left)
+                else:
+                    done = not self.is_truthy(left)
+
+                if not done:
+                    values.pop()
+                    push((EVALUATE, node.right))
+
+            elif action == ASSIGN:
+                value = values[-1]
+
+                if node.depth == None:
+                    self.globals.set(node.name, value)
+                else:
+                    self.environment.ancestor(node.depth) \
+                        .values[node.slot] = value
+
+            elif action == CALL:
+                # Calls aren't implemented, like in the tree-walker
+                values[-1] = None
+
+            elif action == DISCARD:
+                values.pop()
+
+            elif action == PRINT:
+                self.stdout.write(f"{self.stringify(values.pop())}\n")
+
+            elif action == VAR:
+                value = values.pop()
+
+                if node.slot == None:
+                    self.globals.define(node.name, value)
+                else:
+                    self.environment.values[node.slot] = value
+
+            elif action == BRANCH:
+                if self.is_truthy(values.pop()):
+                    push((EXECUTE, node.thenBranch))
+                elif node.elseBranch != None:
+                    push((EXECUTE, node.elseBranch))
+
+            elif action == LOOP:
+                if self.is_truthy(values.pop()):
+                    # Test again once the body has run
+                    push((LOOP, node))
+                    push((EVALUATE, node.condition))
+
+                    # Charged at the back edge, after the body
+                    if budget != None:
+                        push((STEP, node))
+
+                    push((EXECUTE, node.body))
+
+            elif action == STEP:
+                budget.step(node.keyword)
+
+            elif action == LEAVE:
+                # Leaving a block, node is the enclosing scope
+                self.environment = node
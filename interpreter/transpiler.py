@@ -0,0 +1,453 @@
+import math
+from interpreter.closure_compiler import ClosureInterpreter
+from interpreter.interpreter import Interpreter
+from interpreter.lox_runtime_error import LoxRuntimeError
+from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, Unary, ExprVisitor, Grouping, Variable
+from parser.stmt import Block, Expression, ForRange, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token import Token
+from scanner.token_type import TokenType as tt
+
+NUMBER_OPERATORS = {
+    tt.MINUS: "-",
+    tt.STAR: "*",
+    tt.MODULO: "%",
+    tt.LESS: "<",
+    tt.LESS_EQUAL: "<=",
+    tt.GREATER: ">",
+    tt.GREATER_EQUAL: ">=",
+}
+
+# Operators whose result is always a float
+FLOAT_RESULTS = {tt.MINUS, tt.STAR, tt.MODULO, tt.SLASH}
+
+# Operators whose result is always a bool
+BOOL_RESULTS = {
+    tt.LESS, tt.LESS_EQUAL, tt.GREATER, tt.GREATER_EQUAL,
+    tt.EQUAL_EQUAL, tt.BANG_EQUAL
+}
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    """
+    Turns a resolved tree into the source of a Python function.
+
+    Expressions are flattened into one Python statement per
+    operation, storing intermediate values in temporaries, so
+    operands keep the tree-walker's right to left order and
+    type checks stay explicit. Every expression visitor emits
+    the statements computing the value and returns the Python
+    expression (a temporary, a local or a constant) holding it.
+
+    Lox locals become Python locals with a unique name per
+    declaration, globals live in the interpreter's globals dict.
+    Tokens that errors can point at are passed in through `T`.
+    """
+
+    def __init__(self, budget: bool = False):
+        # Whether loops charge a step to the budget
+        self.budget = budget
+
+        self.lines = []
+        self.indent = 1
+        self.tokens: list[Token] = []
+        self.temp_count = 0
+
+        # Python names of the locals of every enclosing block,
+        # indexed by slot
+        self.scopes: list[list[str]] = []
+        self.local_count = 0
+
+    def transpile(self, stmts: list[Stmt]) -> str:
+        for stmt in stmts:
+            self.run(stmt)
+
+        self.emit("pass")
+
+        header = "def lox_main(G, T, fail, undefined, redefined, " \
+                 "divide_error, stringify, write, step):"
+
+        return "\n".join([header] + self.lines) + "\n"
+
+    def run(self, node: Expr | Stmt):
+        return node.accept(self)
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+
+    def temp(self):
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def token(self, token: Token):
+        self.tokens.append(token)
+        return f"T[{len(self.tokens) - 1}]"
+
+    def local(self, depth: int, slot: int):
+        return self.scopes[-1 - depth][slot]
+
+    def is_atom(self, expr: Expr):
+        """
+        Atoms are read in place instead of
+        being copied into a temporary
+        """
+        while type(expr) == Grouping:
+            expr = expr.expr
+
+        return type(expr) == Literal \
+            or (type(expr) == Variable and expr.depth != None)
+
+    def has_assignment(self, expr: Expr):
+        if type(expr) == Assign:
+            return True
+        elif type(expr) in (Binary, Logical):
+            return self.has_assignment(expr.left) \
+                or self.has_assignment(expr.right)
+        elif type(expr) == Unary:
+            return self.has_assignment(expr.right)
+        elif type(expr) == Grouping:
+            return self.has_assignment(expr.expr)
+
+        return False
+
+    def is_float(self, expr: Expr):
+        """
+        Whether the expression is known to be a float
+        without having to check it at runtime
+        """
+        while type(expr) == Grouping:
+            expr = expr.expr
+
+        if type(expr) == Literal:
+            return type(expr.value) == float
+        elif type(expr) == Binary:
+            return expr.op.type in FLOAT_RESULTS
+        elif type(expr) == Unary:
+            return expr.op.type == tt.MINUS
+
+        return False
+
+    def is_bool(self, expr: Expr):
+        while type(expr) == Grouping:
+            expr = expr.expr
+
+        if type(expr) == Binary:
+            return expr.op.type in BOOL_RESULTS
+        elif type(expr) == Unary:
+            return expr.op.type == tt.BANG
+        elif type(expr) == Literal:
+            return type(expr.value) == bool
+
+        return False
+
+    def truthy(self, expr: Expr, value: str):
+        """
+        Returns a Python condition that is true
+        when `value` is truthy in Lox
+        """
+        if self.is_bool(expr):
+            return value
+
+        literal = self.literal(expr)
+
+        # CPython warns about `is` with a literal, and
+        # the answer is known anyway
+        if literal != None:
+            return repr(literal.value is not None
+                        and literal.value is not False)
+
+        return f"({value} is not None and {value} is not False)"
+
+    def literal(self, expr: Expr):
+        """
+        The Literal the expression is, None if it isn't one
+        """
+        while type(expr) == Grouping:
+            expr = expr.expr
+
+        return expr if type(expr) == Literal else None
+
+    def operands(self, expr: Binary):
+        right = self.run(expr.right)
+
+        # The left operand is evaluated after the right one,
+        # so an assignment in it could change an atom on the
+        # right before it gets used
+        if self.is_atom(expr.right) and self.has_assignment(expr.left):
+            temp = self.temp()
+            self.emit(f"{temp} = {right}")
+            right = temp
+
+        left = self.run(expr.left)
+        return left, right
+
+    def check_numbers(self, expr: Binary, left: str, right: str):
+        checks = []
+
+        if not self.is_float(expr.left):
+            checks.append(f"type({left}) is not float")
+
+        if not self.is_float(expr.right):
+            checks.append(f"type({right}) is not float")
+
+        if checks:
+            self.emit(f"if {' or '.join(checks)}:")
+            self.emit(f"    fail('Operands must be numbers', "
+                      f"{self.token(expr.op)})")
+
+    def visit_block_stmt(self, stmt: Block):
+        # Blocks without locals aren't scopes, depths skip them
+        if not stmt.slots:
+            for statement in stmt.statements:
+                self.run(statement)
+            return
+
+        self.scopes.append([])
+
+        for statement in stmt.statements:
+            self.run(statement)
+
+        self.scopes.pop()
+
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.slot == None:
+            value = self.initializer(stmt)
+            self.emit(f"if {stmt.name.lexeme!r} in G:")
+            self.emit(f"    redefined({self.token(stmt.name)})")
+            self.emit(f"G[{stmt.name.lexeme!r}] = {value}")
+            return
+
+        # The slot exists before the initializer runs,
+        # which can assign it: var c = c = 1;
+        self.local_count += 1
+        name = f"v{self.local_count}_{stmt.name.lexeme}"
+        self.scopes[-1].append(name)
+        self.emit(f"{name} = {self.initializer(stmt)}")
+
+    def initializer(self, stmt: Var):
+        if stmt.initializer == None:
+            return "None"
+
+        return self.run(stmt.initializer)
+
+    def visit_expression_stmt(self, stmt: Expression):
+        self.run(stmt.expr)
+
+    def visit_print_stmt(self, stmt: Print):
+        self.emit(f"write(str(stringify({self.run(stmt.expr)})) + '\\n')")
+
+    def visit_if_stmt(self, stmt: If):
+        condition = self.run(stmt.condition)
+        self.emit(f"if {self.truthy(stmt.condition, condition)}:")
+
+        self.indent += 1
+        self.run(stmt.thenBranch)
+        self.emit("pass")
+        self.indent -= 1
+
+        if stmt.elseBranch != None:
+            self.emit("else:")
+            self.indent += 1
+            self.run(stmt.elseBranch)
+            self.emit("pass")
+            self.indent -= 1
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        # The loop already counts with Python floats
+        self.run(stmt.loop)
+
+    def visit_while_stmt(self, stmt: While):
+        self.emit("while True:")
+        self.indent += 1
+
+        condition = self.run(stmt.condition)
+        self.emit(f"if not {self.truthy(stmt.condition, condition)}:")
+        self.emit("    break")
+
+        self.run(stmt.body)
+
+        if self.budget:
+            self.emit(f"step({self.token(stmt.keyword)})")
+
+        self.indent -= 1
+
+    def visit_literal_expr(self, expr: Literal):
+        if type(expr.value) == float and not math.isfinite(expr.value):
+            return f"float({str(expr.value)!r})"
+
+        return repr(expr.value)
+
+    def visit_grouping_expr(self, expr: Grouping):
+        return self.run(expr.expr)
+
+    def visit_variable_expr(self, expr: Variable):
+        if expr.depth != None:
+            return self.local(expr.depth, expr.slot)
+
+        temp = self.temp()
+        self.emit("try:")
+        self.emit(f"    {temp} = G[{expr.name.lexeme!r}]")
+        self.emit("except KeyError:")
+        self.emit(f"    undefined({self.token(expr.name)})")
+        return temp
+
+    def visit_assign_expr(self, expr: Assign):
+        value = self.run(expr.value)
+        temp = self.temp()
+
+        if expr.depth == None:
+            self.emit(f"if {expr.name.lexeme!r} not in G:")
+            self.emit(f"    undefined({self.token(expr.name)})")
+            self.emit(f"G[{expr.name.lexeme!r}] = {temp} = {value}")
+        else:
+            name = self.local(expr.depth, expr.slot)
+            self.emit(f"{name} = {temp} = {value}")
+
+        return temp
+
+    def visit_logical_expr(self, expr: Logical):
+        temp = self.temp()
+        self.emit(f"{temp} = {self.run(expr.left)}")
+
+        if expr.op.type == tt.OR:
+            self.emit(f"if {temp} is None or {temp} is False:")
+        else:
+            self.emit(f"if {temp} is not None and {temp} is not False:")
+
+        self.indent += 1
+        self.emit(f"{temp} = {self.run(expr.right)}")
+        self.indent -= 1
+
+        return temp
+
+    def visit_unary_expr(self, expr: Unary):
+        right = self.run(expr.right)
+        temp = self.temp()
+
+        if expr.op.type == tt.MINUS:
+            if not self.is_float(expr.right):
+                self.emit(f"if type({right}) is not float:")
+                self.emit(f"    fail('Operand must be a number', "
+                          f"{self.token(expr.op)})")
+
+            self.emit(f"{temp} = -{right}")
+        elif self.literal(expr.right) != None:
+            self.emit(f"{temp} = not {self.truthy(expr.right, right)}")
+        else:
+            self.emit(f"{temp} = {right} is None or {right} is False")
+
+        return temp
+
+    def visit_binary_expr(self, expr: Binary):
+        left, right = self.operands(expr)
+        temp = self.temp()
+        op = expr.op.type
+
+        if op == tt.PLUS:
+            if self.is_float(expr.left) and self.is_float(expr.right):
+                self.emit(f"{temp} = {left} + {right}")
+            elif self.is_float(expr.left) or self.is_float(expr.right):
+                other = right if self.is_float(expr.left) else left
+                self.emit(f"{temp} = {left} + {right} "
+                          f"if type({other}) is float else None")
+            else:
+                self.emit(f"if type({left}) is float "
+                          f"and type({right}) is float "
+                          f"or type({left}) is str "
+                          f"and type({right}) is str:")
+                self.emit(f"    {temp} = {left} + {right}")
+                self.emit("else:")
+                self.emit(f"    {temp} = None")
+
+        elif op == tt.SLASH:
+            self.check_numbers(expr, left, right)
+
+            if not (type(expr.right) == Literal and expr.right.value):
+                self.emit(f"if {right} == 0:")
+                self.emit(f"    divide_error({left}, {right}, "
+                          f"{self.token(expr.op)})")
+
+            self.emit(f"{temp} = {left} / {right}")
+
+        elif op == tt.EQUAL_EQUAL:
+            self.emit(f"{temp} = {left} == {right}")
+
+        elif op == tt.BANG_EQUAL:
+            self.emit(f"{temp} = {left} != {right}")
+
+        else:
+            self.check_numbers(expr, left, right)
+            self.emit(f"{temp} = {left} {NUMBER_OPERATORS[op]} {right}")
+
+        return temp
+
+    def visit_call_expr(self, expr: Call):
+        self.run(expr.callee)
+        return "None"
+
+
+class PythonInterpreter(Interpreter):
+    """
+    Runs a program by transpiling it to Python
+    and handing it to compile()
+
+    Programs nesting loops and branches deeper than CPython
+    allows in one function run on the closure engine instead.
+    """
+
+    def execute_program(self, stmts: list[Stmt]):
+        # Run once, only the version this run needs
+        budgets = (self.budget != None,)
+        self.execute_compiled(self.compile_program(stmts, budgets))
+
+    @classmethod
+    def compile_program(cls, stmts: list[Stmt], budgets=(False, True)):
+        """
+        Loops only charge steps in the version run with a budget,
+        returns a (lox_main, tokens) for each of `budgets`
+        """
+        try:
+            return {budget: cls.transpile(stmts, budget)
+                    for budget in budgets}
+        except SyntaxError:
+            # Too many statically nested blocks, or too
+            # many levels of indentation
+            return ClosureInterpreter.compile_program(stmts)
+
+    @staticmethod
+    def transpile(stmts: list[Stmt], budget: bool):
+        transpiler = Transpiler(budget)
+        source = transpiler.transpile(stmts)
+
+        namespace = {}
+        exec(compile(source, "<lox>", "exec"), namespace)
+
+        return namespace["lox_main"], transpiler.tokens
+
+    def execute_compiled(self, program: dict | tuple):
+        if type(program) != dict:
+            ClosureInterpreter.execute_compiled(self, program)
+            return
+
+        lox_main, tokens = program[self.budget != None]
+        lox_main(self.globals.variables, tokens,
+                 self.fail, self.undefined, self.redefined,
+                 self.divide_error, self.stringify,
+                 self.stdout.write,
+                 self.budget and self.budget.step)
+
+    def fail(self, message: str, token: Token):
+        raise LoxRuntimeError(message, token)
+
+    def undefined(self, name: Token):
+        raise LoxRuntimeError(f"Undefined variable "
+                              f"'{name.lexeme}'", name)
+
+    def redefined(self, name: Token):
+        raise LoxRuntimeError(f"Variable already defined "
+                              f"'{name.lexeme}'", name)
+
+    def divide_error(self, left, right, op: Token):
+        raise LoxRuntimeError(
+            f"Division by 0 between {self.stringify(left)} "
+            f"and {self.stringify(right)}",
+            op)
@@ -1,18 +1,95 @@
+from interpreter.arena_interpreter import ArenaInterpreter
+from interpreter.budget import Budget
+from interpreter.closure_compiler import ClosureInterpreter
 from interpreter.interpreter import Interpreter
 from interpreter.lox_runtime_error import LoxRuntimeError
+from interpreter.line_profiler import LineProfiler
+from interpreter.optimizer import Optimizer
+from interpreter.output import DEFAULT_BUFFER_SIZE, Output
+from interpreter.profiling import NoProfile, PhaseProfile
+from interpreter.resolver import Resolver
+from interpreter.stack_interpreter import StackInterpreter
+from interpreter.transpiler import PythonInterpreter
+from parser.arena import Arena
+from parser.ast_printer import AstPrinter
+from parser.iterative_parser import IterativeParser
 from parser.parser import Parser
+from parser.pratt_parser import PrattParser
+from parser.program_cache import ProgramCache
+import argparse
+import os
 import sys
+import time
+from scanner.regex_scanner import CompactScanner, RegexScanner
 from scanner.scanner import Scanner
 from scanner.token import Token
 from scanner.token_type import TokenType as tt
+from vm.vm import VM
+
+
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VM,
+    "python": PythonInterpreter,
+    "arena": ArenaInterpreter,
+    "stack": StackInterpreter,
+}
+
+PARSERS = {
+    "recursive": Parser,
+    "iterative": IterativeParser,
+    "pratt": PrattParser,
+}
+
+SCANNERS = {
+    "char": Scanner,
+    "regex": RegexScanner,
+    "compact": CompactScanner,
+}
 
 
 class Lox:
     has_error = False
+    has_runtime_error = False
+
+    # Where programs print and errors are reported, shared like
+    # the error flags so both come out in the order they happened
+    output = Output()
+
+    def __init__(self, engine: str = "tree", optimize: bool = False,
+                 dump_ast: bool = False, scanner: str = "char",
+                 stream: bool = False, cache: bool = True,
+                 cache_dir: str = None, write_arena: str = None,
+                 profile: bool = False, profile_memory: bool = False,
+                 line_profile: bool = False,
+                 collapsed: str = None, max_steps: int = None,
+                 timeout: float = None, parser: str = "recursive",
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.engine = engine
+        self.buffer_size = buffer_size
+        self.parser = parser
+        self.max_steps = max_steps
+        self.timeout = timeout
+
+        # Budget of the last run, None without limits
+        self.budget = None
+
+        self.line_profile = line_profile or collapsed != None
+        self.collapsed = collapsed
+        self.profiler = PhaseProfile(profile_memory) \
+            if profile or profile_memory else NoProfile()
+        self.write_arena = write_arena
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self.stream = stream
+        self.scanner = scanner
+        self.optimize = optimize
+        self.dump_ast = dump_ast
 
     @classmethod
     def report(self, line: int, where: str, message: str):
-        print(f"[line {line}] Error{where}: {message}")
+        self.output.write(f"[line {line}] Error{where}: {message}\n")
         self.has_error = True
 
     @classmethod
@@ -25,40 +102,317 @@ class Lox:
         self.has_error = True
 
     def main(self):
-        if len(sys.argv) < 2:
-            print("Usage: python main.py [program]")
+        arg_parser = argparse.ArgumentParser(prog="main.py")
+        arg_parser.add_argument("program", nargs="?")
+        arg_parser.add_argument("--engine", choices=ENGINES,
+                                default=self.engine,
+                                help="execution engine (default: tree)")
+        arg_parser.add_argument("--scanner", choices=SCANNERS,
+                                default=self.scanner,
+                                help="scanner implementation (default: char)")
+        arg_parser.add_argument("--parser", choices=PARSERS,
+                                default=self.parser,
+                                help="parser implementation "
+                                     "(default: recursive)")
+        arg_parser.add_argument("--stream", action="store_true",
+                                help="run each top level declaration "
+                                     "as soon as it is parsed, the "
+                                     "program is never cached")
+        arg_parser.add_argument("--no-cache", dest="cache",
+                                action="store_false",
+                                help="don't read or write cached programs")
+        arg_parser.add_argument("--cache-dir",
+                                help="where to keep cached programs "
+                                     "(default: __loxcache__ next to "
+                                     "the program)")
+        arg_parser.add_argument("-O", dest="optimize", action="store_true",
+                                help="fold constants and prune dead code "
+                                     "before running")
+        arg_parser.add_argument("--dump-ast", action="store_true",
+                                help="print the tree before and after "
+                                     "optimizing")
+        arg_parser.add_argument("--write-arena", metavar="PATH",
+                                help="write the prepared program as a "
+                                     "flat arena to PATH instead of "
+                                     "running it, run it later with "
+                                     "main.py PATH")
+        arg_parser.add_argument("--profile", action="store_true",
+                                help="report the time spent in every "
+                                     "phase, counts of tokens, nodes "
+                                     "and scopes, on stderr")
+        arg_parser.add_argument("--profile-memory", action="store_true",
+                                help="--profile and report peak memory, "
+                                     "tracing allocations slows every "
+                                     "phase down")
+        arg_parser.add_argument("--line-profile", action="store_true",
+                                help="report the time spent on every "
+                                     "line of the program, on stderr")
+        arg_parser.add_argument("--collapsed", metavar="PATH",
+                                help="profile lines and write the time "
+                                     "of every stack of lines to PATH, "
+                                     "for flamegraph tools")
+        arg_parser.add_argument("--max-steps", type=int, metavar="N",
+                                help="stop the program after N loop "
+                                     "iterations")
+        arg_parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                                help="stop the program after SECONDS")
+        arg_parser.add_argument("--buffer-size", type=int, metavar="CHARS",
+                                default=self.buffer_size,
+                                help="characters of output held before "
+                                     "writing them out, 0 to write every "
+                                     f"line (default: {DEFAULT_BUFFER_SIZE})")
+        args = arg_parser.parse_args()
+
+        if args.stream:
+            # Streamed programs are never whole, there is no
+            # tree to write, dump, cache or profile by line
+            for flag, value in (("--profile", args.profile),
+                                ("--profile-memory", args.profile_memory),
+                                ("--write-arena", args.write_arena),
+                                ("--dump-ast", args.dump_ast),
+                                ("--cache-dir", args.cache_dir),
+                                ("--line-profile", args.line_profile),
+                                ("--collapsed", args.collapsed)):
+                if value:
+                    arg_parser.error(f"{flag} can't be used with --stream")
+
+        if (args.line_profile or args.collapsed) and args.engine != "tree":
+            arg_parser.error("line profiling needs the tree engine")
+
+        self.engine = args.engine
+        self.scanner = args.scanner
+        self.parser = args.parser
+        self.stream = args.stream
+        self.cache = args.cache
+        self.cache_dir = args.cache_dir
+        self.optimize = args.optimize
+        self.dump_ast = args.dump_ast
+        self.write_arena = args.write_arena
+        self.line_profile = args.line_profile or args.collapsed != None
+        self.collapsed = args.collapsed
+        self.max_steps = args.max_steps
+        self.timeout = args.timeout
+        self.buffer_size = args.buffer_size
+
+        if args.profile or args.profile_memory:
+            self.profiler = PhaseProfile(args.profile_memory)
+
+        if args.program == None:
+            self.run_prompt()
         else:
-            self.runFile(sys.argv[1])
+            self.runFile(args.program)
 
     def runFile(self, path: str):
-        with open(path) as file:
-            self.run(file.read())
+        self.output.buffer_size = self.buffer_size
+        self.profiler.start()
 
-        if self.has_error:
+        try:
+            if path.endswith(".loxa"):
+                self.run_arena(path)
+            else:
+                with open(path) as file:
+                    if self.stream:
+                        self.run_streaming(file.read())
+                    else:
+                        self.run(file.read(), path)
+        finally:
+            self.output.flush()
+
+        self.profiler.report()
+
+        if self.budget != None:
+            print(f"steps: {self.budget.used}", file=sys.stderr)
+
+        if self.has_error or self.has_runtime_error:
             exit(1)
 
-    def run(self, source):
-        scanner = Scanner(source)
-        tokens = scanner.scan()
+    def run_prompt(self):
+        """
+        Read and run one line at a time. A single interpreter
+        is kept for the whole session, so globals survive from
+        one line to the next and errors only abort their line.
+        """
+        self.output.buffer_size = self.buffer_size
+        interpreter = ENGINES[self.engine](self.output)
+
+        while True:
+            try:
+                line = input("> ")
+            except EOFError:
+                print()
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+
+            start = time.perf_counter()
+            interpreter.budget = self.new_budget()
+
+            try:
+                self.run(line, interpreter=interpreter)
+            except KeyboardInterrupt:
+                self.output.write("Interrupted\n")
+
+            self.output.flush()
+
+            elapsed = time.perf_counter() - start
+
+            if self.budget != None:
+                print(f"[{elapsed * 1000:.3f} ms, "
+                      f"{self.budget.used} steps]")
+            else:
+                print(f"[{elapsed * 1000:.3f} ms]")
+
+            Lox.has_error = False
+            Lox.has_runtime_error = False
+
+    def run(self, source, path: str = None, interpreter=None):
+        # Dumping the tree needs the passes to actually run
+        cache = None
+
+        if self.cache and path != None and not self.dump_ast:
+            cache = ProgramCache(self.cache_dir)
+            options = "optimize" if self.optimize else ""
+            tree = cache.load(path, source, options)
+
+            if tree != None:
+                self.profiler.cached = True
+                self.profiler.count_nodes(tree)
+                self.execute(tree, interpreter, source, path)
+                return
+
+        with self.profiler.phase("scan"):
+            scanner = SCANNERS[self.scanner](source)
+            tokens = scanner.scan()
+
+        self.profiler.count_tokens(tokens)
 
         if self.has_error:
             return
 
-        parser = Parser(tokens)
-        tree = parser.parse()
+        with self.profiler.phase("parse"):
+            parser = PARSERS[self.parser](tokens)
+            tree = parser.parse()
 
         if self.has_error:
             return
 
-        interpreter = Interpreter()
-        interpreter.interpret(tree)
+        self.profiler.count_nodes(tree)
+
+        with self.profiler.phase("prepare"):
+            tree = self.prepare(tree)
 
         if self.has_error:
             return
 
+        if cache != None:
+            cache.store(path, source, tree, options)
+
+        self.execute(tree, interpreter, source, path)
+
+    def execute(self, tree, interpreter=None, source: str = "",
+                path: str = None):
+        if self.write_arena != None:
+            Arena.from_tree(tree).write(self.write_arena)
+            return
+
+        if self.line_profile and interpreter == None:
+            self.execute_profiled(tree, source, path)
+            return
+
+        with self.profiler.phase("execute"), self.profiler.counting_scopes():
+            if interpreter == None:
+                interpreter = ENGINES[self.engine](self.output,
+                                                   self.new_budget())
+
+            interpreter.interpret(tree)
+
+    def new_budget(self):
+        """
+        Start the budget of a run, None without limits
+        """
+        if self.max_steps == None and self.timeout == None:
+            self.budget = None
+        else:
+            self.budget = Budget(self.max_steps, self.timeout)
+
+        return self.budget
+
+    def execute_profiled(self, tree, source: str, path: str = None):
+        profiler = LineProfiler(self.output, self.new_budget())
+        profiler.interpret(tree)
+        profiler.report(source)
+
+        if self.collapsed != None:
+            name = os.path.basename(path) if path != None else "<script>"
+            profiler.write_collapsed(self.collapsed, name)
+
+    def run_arena(self, path: str):
+        """
+        Run an arena written with --write-arena, it is
+        mapped from disk and already resolved
+        """
+        try:
+            arena = Arena.load(path)
+        except ValueError as error:
+            print(error, file=self.output)
+            exit(1)
+
+        self.profiler.count_arena(arena)
+
+        with self.profiler.phase("execute"), self.profiler.counting_scopes():
+            interpreter = ArenaInterpreter(self.output, self.new_budget())
+            interpreter.interpret_arena(arena)
+
+    def run_streaming(self, source):
+        """
+        Scan, parse and run top level declarations one at
+        a time, so the whole program never has to be held
+        as tokens or as a tree
+        """
+        scanner = SCANNERS[self.scanner](source)
+        parser = PARSERS[self.parser](scanner.stream())
+        interpreter = ENGINES[self.engine](self.output, self.new_budget())
+
+        for stmt in parser.declarations():
+            if self.has_error or self.has_runtime_error:
+                return
+
+            tree = self.prepare([stmt])
+
+            if self.has_error:
+                return
+
+            interpreter.interpret(tree)
+
+    def prepare(self, tree):
+        """
+        Run the passes between parsing and executing
+        """
+        if self.dump_ast:
+            print("== parsed ==", file=self.output)
+            AstPrinter().print_program(tree, self.output)
+
+        # Resolved as written, so whatever the optimizer
+        # removes still has to be a valid program
+        Resolver().resolve(tree)
+
+        if self.optimize and not self.has_error:
+            tree = Optimizer().optimize(tree)
+
+            if self.dump_ast:
+                print("== optimized ==", file=self.output)
+                AstPrinter().print_program(tree, self.output)
+
+            # Again for the nodes the optimizer created
+            Resolver().resolve(tree)
+
+        return tree
+
     @classmethod
     def runtime_error(self, error: LoxRuntimeError):
-        print(f"Error at line {error.token.line}:\n"
-              f"{error.message}")
-        
-        exit(1)
+        self.output.write(f"Error at line {error.token.line}:\n"
+                          f"{error.message}\n")
+        self.output.flush()
+
+        self.has_runtime_error = True
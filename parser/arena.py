@@ -0,0 +1,312 @@
+from array import array
+import marshal
+import mmap
+import struct
+import sys
+from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, Unary, ExprVisitor, Grouping, Variable
+from parser.stmt import Block, Expression, ForRange, Function, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token import Token
+from scanner.token_buffer import TYPES, TYPE_CODES
+
+MAGIC = b"LOXA"
+VERSION = 3
+
+# version, byte order, then the length of every array
+# and of the pools, followed by the root list
+HEADER = struct.Struct("<4sII8QII")
+
+# Order the arrays are written in, with their typecodes
+ARRAYS = (
+    ("kinds", "B"),
+    ("a", "i"),
+    ("b", "i"),
+    ("c", "i"),
+    ("tokens", "i"),
+    ("children", "i"),
+    ("token_types", "B"),
+    ("token_lines", "i"),
+)
+
+NONE = -1
+
+
+class Arena:
+    """
+    A whole program stored as parallel typed arrays instead
+    of an object graph. Node ids index the node arrays:
+
+        kinds    the node's kind, the same as its class' kind
+        a, b, c  children ids or small ints, depending on the kind
+        tokens   index of the node's token, or -1
+
+    Lists of children (block statements, call arguments) are
+    runs in `children`, a node stores their start and length.
+    Tokens are split into `token_types`, `token_lines` and an
+    index into `lexemes`, literal values live in `literals`.
+
+    The arrays are written to disk as is, so loading maps the
+    file and casts slices of it, without parsing or creating
+    an object per node. Only the two pools are unmarshalled.
+
+    Node layouts, missing children are -1:
+
+        Binary, Logical  a=left b=right token=op
+        Unary            a=right token=op
+        Literal          a=literal
+        Grouping         a=expr
+        Variable         a=depth b=slot token=name
+        Assign           a=value b=depth c=slot token=name
+        Call             a=callee b=start c=count token=paren
+        Var              a=initializer b=slot token=name
+        Expression       a=expr
+        Print            a=expr
+        Block            a=start b=count c=slots
+        If               a=condition b=then c=else
+        While            a=condition b=body token=keyword
+        Function         a=start b=count token=name
+    """
+
+    def __init__(self):
+        for name, typecode in ARRAYS:
+            setattr(self, name, array(typecode))
+
+        self.token_lexemes = array("i")
+        self.lexemes: list[str] = []
+        self.literals: list = []
+
+        # Top level statements, a run in `children`
+        self.root_start = 0
+        self.root_count = 0
+
+        # Keeps the mapped file open while the arrays point into it
+        self.mapping = None
+
+    @classmethod
+    def from_tree(cls, stmts: list[Stmt]):
+        return ArenaBuilder(cls()).build(stmts)
+
+    def token(self, index: int):
+        """
+        Materialize a token, only needed for error reporting
+        """
+        return Token(TYPES[self.token_types[index]],
+                     self.lexemes[self.token_lexemes[index]],
+                     None, self.token_lines[index])
+
+    def write(self, path: str):
+        pools = marshal.dumps((self.lexemes, self.literals))
+        arrays = [getattr(self, name) for name, _ in ARRAYS]
+        arrays.append(self.token_lexemes)
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION,
+                                   sys.byteorder == "little",
+                                   *(len(array) for array in arrays[:-1]),
+                                   self.root_start, self.root_count))
+            file.write(struct.pack("<Q", len(pools)))
+
+            for values in arrays:
+                # Keep every array aligned to its item size
+                file.write(b"\0" * (-file.tell() % 8))
+                file.write(values.tobytes())
+
+            file.write(pools)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Map an arena written by `write`. Raises
+        ValueError if the file isn't a valid arena.
+        """
+        arena = cls()
+
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapping)
+
+        if len(view) < HEADER.size + 8 or view[:4] != MAGIC:
+            raise ValueError(f"{path} is not an arena")
+
+        magic, version, little, *lengths, root_start, root_count = \
+            HEADER.unpack_from(view)
+
+        if version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} arena")
+
+        if little != (sys.byteorder == "little"):
+            raise ValueError(f"{path} was written with another byte order")
+
+        offset = HEADER.size
+        pools_length, = struct.unpack_from("<Q", view, offset)
+        offset += 8
+
+        # token_lexemes has as many entries as token_types
+        lengths.append(lengths[ARRAYS.index(("token_types", "B"))])
+        names = [name for name, _ in ARRAYS] + ["token_lexemes"]
+        typecodes = [typecode for _, typecode in ARRAYS] + ["i"]
+
+        for name, typecode, length in zip(names, typecodes, lengths):
+            offset += -offset % 8
+            size = length * array(typecode).itemsize
+
+            # Lengths come from the file, check them before
+            # slicing so a truncated file isn't cut short quietly
+            if offset + size > len(view):
+                raise ValueError(f"{path} is truncated")
+
+            setattr(arena, name, view[offset:offset + size].cast(typecode))
+            offset += size
+
+        if offset + pools_length > len(view):
+            raise ValueError(f"{path} is truncated")
+
+        try:
+            arena.lexemes, arena.literals = \
+                marshal.loads(view[offset:offset + pools_length])
+        except (EOFError, TypeError, ValueError) as error:
+            raise ValueError(f"{path} has broken pools: {error}")
+
+        if root_start + root_count > len(arena.children):
+            raise ValueError(f"{path} has roots past its children")
+
+        arena.root_start = root_start
+        arena.root_count = root_count
+        arena.mapping = mapping
+
+        return arena
+
+
+class ArenaBuilder(ExprVisitor, StmtVisitor):
+    """
+    Flattens a resolved tree into an Arena.
+    Every visit returns the id of the node it added.
+    """
+
+    def __init__(self, arena: Arena):
+        self.arena = arena
+        self.lexeme_index = {}
+        self.literal_index = {}
+
+    def build(self, stmts: list[Stmt]):
+        self.arena.root_start, self.arena.root_count = self.add_list(stmts)
+        return self.arena
+
+    def run(self, node: Expr | Stmt):
+        return node.accept(self)
+
+    def add(self, kind: int, a=NONE, b=NONE, c=NONE, token=NONE):
+        arena = self.arena
+        arena.kinds.append(kind)
+        arena.a.append(a)
+        arena.b.append(b)
+        arena.c.append(c)
+        arena.tokens.append(token)
+        return len(arena.kinds) - 1
+
+    def add_list(self, nodes: list[Expr | Stmt]):
+        """
+        Add the nodes, then store their ids in one
+        run of `children`, returns (start, count)
+        """
+        ids = [self.run(node) for node in nodes]
+        start = len(self.arena.children)
+        self.arena.children.extend(ids)
+        return start, len(ids)
+
+    def add_token(self, token: Token):
+        arena = self.arena
+
+        if token.lexeme not in self.lexeme_index:
+            self.lexeme_index[token.lexeme] = len(arena.lexemes)
+            arena.lexemes.append(token.lexeme)
+
+        arena.token_types.append(TYPE_CODES[token.type])
+        arena.token_lines.append(token.line)
+        arena.token_lexemes.append(self.lexeme_index[token.lexeme])
+        return len(arena.token_types) - 1
+
+    def add_literal(self, value):
+        # Key on the type and repr, so 1 and true or
+        # 0 and -0 don't end up sharing a slot
+        key = (type(value), repr(value))
+
+        if key not in self.literal_index:
+            self.literal_index[key] = len(self.arena.literals)
+            self.arena.literals.append(value)
+
+        return self.literal_index[key]
+
+    def optional(self, node: Expr | Stmt | None):
+        return NONE if node == None else self.run(node)
+
+    def address(self, value: int | None):
+        return NONE if value == None else value
+
+    def visit_binary_expr(self, expr: Binary):
+        return self.add(Binary.kind, self.run(expr.left), self.run(expr.right),
+                        token=self.add_token(expr.op))
+
+    def visit_logical_expr(self, expr: Logical):
+        return self.add(Logical.kind, self.run(expr.left),
+                        self.run(expr.right), token=self.add_token(expr.op))
+
+    def visit_unary_expr(self, expr: Unary):
+        return self.add(Unary.kind, self.run(expr.right),
+                        token=self.add_token(expr.op))
+
+    def visit_literal_expr(self, expr: Literal):
+        return self.add(Literal.kind, self.add_literal(expr.value))
+
+    def visit_grouping_expr(self, expr: Grouping):
+        return self.add(Grouping.kind, self.run(expr.expr))
+
+    def visit_variable_expr(self, expr: Variable):
+        return self.add(Variable.kind, self.address(expr.depth),
+                        self.address(expr.slot),
+                        token=self.add_token(expr.name))
+
+    def visit_assign_expr(self, expr: Assign):
+        return self.add(Assign.kind, self.run(expr.value),
+                        self.address(expr.depth), self.address(expr.slot),
+                        token=self.add_token(expr.name))
+
+    def visit_call_expr(self, expr: Call):
+        callee = self.run(expr.callee)
+        start, count = self.add_list(expr.arguments)
+        return self.add(Call.kind, callee, start, count,
+                        token=self.add_token(expr.paren))
+
+    def visit_var_stmt(self, stmt: Var):
+        return self.add(Var.kind, self.optional(stmt.initializer),
+                        self.address(stmt.slot),
+                        token=self.add_token(stmt.name))
+
+    def visit_expression_stmt(self, stmt: Expression):
+        return self.add(Expression.kind, self.run(stmt.expr))
+
+    def visit_print_stmt(self, stmt: Print):
+        return self.add(Print.kind, self.run(stmt.expr))
+
+    def visit_block_stmt(self, stmt: Block):
+        start, count = self.add_list(stmt.statements)
+        return self.add(Block.kind, start, count, stmt.slots)
+
+    def visit_if_stmt(self, stmt: If):
+        return self.add(If.kind, self.run(stmt.condition),
+                        self.run(stmt.thenBranch),
+                        self.optional(stmt.elseBranch))
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        # Arenas have no counted loops, they keep the While
+        return self.run(stmt.loop)
+
+    def visit_while_stmt(self, stmt: While):
+        return self.add(While.kind, self.run(stmt.condition),
+                        self.run(stmt.body),
+                        token=self.add_token(stmt.keyword))
+
+    def visit_function_stmt(self, stmt: Function):
+        start, count = self.add_list(stmt.body)
+        return self.add(Function.kind, start, count,
+                        token=self.add_token(stmt.name))
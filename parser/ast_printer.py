@@ -1,9 +1,13 @@
 from parser import expr
+from parser import stmt
 
-class AstPrinter(expr.ExprVisitor):
+class AstPrinter(expr.ExprVisitor, stmt.StmtVisitor):
     def visit_binary_expr(self, expr: expr.Binary):
         return self.eval(expr.op.lexeme, expr.left, expr.right)
 
+    def visit_logical_expr(self, expr: expr.Logical):
+        return self.eval(expr.op.lexeme, expr.left, expr.right)
+
     def visit_unary_expr(self, expr: expr.Unary):
         return self.eval(expr.op.lexeme, expr.right)
 
@@ -12,16 +16,60 @@ class AstPrinter(expr.ExprVisitor):
 
     def visit_grouping_expr(self, expr: expr.Grouping):
         return self.eval("grouped", expr.expr)
-    
+
+    def visit_variable_expr(self, expr: expr.Variable):
+        return expr.name.lexeme
+
+    def visit_assign_expr(self, expr: expr.Assign):
+        return self.eval(f"= {expr.name.lexeme}", expr.value)
+
+    def visit_call_expr(self, expr: expr.Call):
+        return self.eval("call", expr.callee, *expr.arguments)
+
+    def visit_expression_stmt(self, stmt: stmt.Expression):
+        return self.eval(";", stmt.expr)
+
+    def visit_print_stmt(self, stmt: stmt.Print):
+        return self.eval("print", stmt.expr)
+
+    def visit_var_stmt(self, stmt: stmt.Var):
+        if stmt.initializer == None:
+            return self.eval(f"var {stmt.name.lexeme}")
+
+        return self.eval(f"var {stmt.name.lexeme}", stmt.initializer)
+
+    def visit_block_stmt(self, stmt: stmt.Block):
+        return self.eval("block", *stmt.statements)
+
+    def visit_if_stmt(self, stmt: stmt.If):
+        if stmt.elseBranch == None:
+            return self.eval("if", stmt.condition, stmt.thenBranch)
+
+        return self.eval("if", stmt.condition, stmt.thenBranch,
+                         stmt.elseBranch)
+
+    def visit_while_stmt(self, stmt: stmt.While):
+        return self.eval("while", stmt.condition, stmt.body)
+
+    def visit_forrange_stmt(self, stmt: stmt.ForRange):
+        return self.eval(f"for-range {stmt.step}", stmt.loop)
+
+    def visit_function_stmt(self, stmt: stmt.Function):
+        return self.eval(f"fun {stmt.name.lexeme}", *stmt.body)
+
     def eval(self, label, *exprs: expr.Expr):
         out = "("
         out += str(label)
-        
+
         for expr in exprs:
             out += f" {expr.accept(self)}"
-        
+
         out += ")"
         return out
-    
-    def print(self, expr: expr.Expr):
-        print(expr.accept(self))
+
+    def print(self, expr: expr.Expr, file=None):
+        print(expr.accept(self), file=file)
+
+    def print_program(self, stmts: list[stmt.Stmt], file=None):
+        for s in stmts:
+            self.print(s, file)
@@ -1,104 +1,142 @@
-from dataclasses import dataclass
-from scanner.token import Token
-
-
-class Expr:
-    def accept(self, visitor):
-        pass
-
-
-@dataclass
-class Binary(Expr):
-    left: Expr
-    op: Token
-    right: Expr
-
-    def accept(self, visitor):
-        return visitor.visit_binary_expr(self)
-
-
-@dataclass
-class Unary(Expr):
-    op: Token
-    right: Expr
-
-    def accept(self, visitor):
-        return visitor.visit_unary_expr(self)
-
-
-@dataclass
-class Call(Expr):
-    callee: Token
-    paren: Token
-    arguments: list[Expr]
-
-    def accept(self, visitor):
-        return visitor.visit_unary_expr(self)
-
-@dataclass
-class Literal(Expr):
-    value: any
-
-    def accept(self, visitor):
-        return visitor.visit_literal_expr(self)
-
-
-@dataclass
-class Grouping(Expr):
-    expr: Expr
-
-    def accept(self, visitor):
-        return visitor.visit_grouping_expr(self)
-
-
-@dataclass
-class Variable(Expr):
-    name: Token
-
-    def accept(self, visitor):
-        return visitor.visit_variable_expr(self)
-
-
-@dataclass
-class Logical(Expr):
-    left: Expr
-    op: Token
-    right: Expr
-
-    def accept(self, visitor):
-        return visitor.visit_logical_expr(self)
-
-
-@dataclass
-class Assign(Expr):
-    name: Token
-    value: Expr
-
-    def accept(self, visitor):
-        return visitor.visit_assignment_expr(self)
-
-
-class ExprVisitor:
-    def visit_binary_expr(self, expr: Binary):
-        pass
-    
-    def visit_logical_expr(self, expr: Binary):
-        pass
-
-    def visit_unary_expr(self, expr: Unary):
-        pass
-
-    def visit_literal_expr(self, expr: Literal):
-        pass
-
-    def visit_grouping_expr(self, expr: Grouping):
-        pass
-
-    def visit_variable_expr(self, expr: Variable):
-        pass
-
-    def visit_assignment_expr(self, expr: Assign):
-        pass
-
-    def visit_call_expr(self, expr: Call):
-        pass
+from dataclasses import dataclass
+from scanner.token import Token
+
+
+class Expr:
+    __slots__ = ()
+
+    kind = -1
+
+    def accept(self, visitor):
+        pass
+
+
+@dataclass(slots=True)
+class Binary(Expr):
+    left: Expr
+    op: Token
+    right: Expr
+
+    kind = 0
+
+    def accept(self, visitor):
+        return visitor.visit_binary_expr(self)
+
+
+@dataclass(slots=True)
+class Unary(Expr):
+    op: Token
+    right: Expr
+
+    kind = 1
+
+    def accept(self, visitor):
+        return visitor.visit_unary_expr(self)
+
+
+@dataclass(slots=True)
+class Call(Expr):
+    callee: Expr
+    paren: Token
+    arguments: list[Expr]
+
+    kind = 2
+
+    def accept(self, visitor):
+        return visitor.visit_call_expr(self)
+
+
+@dataclass(slots=True)
+class Literal(Expr):
+    value: any
+
+    kind = 3
+
+    def accept(self, visitor):
+        return visitor.visit_literal_expr(self)
+
+
+@dataclass(slots=True)
+class Grouping(Expr):
+    expr: Expr
+
+    kind = 4
+
+    def accept(self, visitor):
+        return visitor.visit_grouping_expr(self)
+
+
+@dataclass(slots=True)
+class Variable(Expr):
+    name: Token
+    depth: int | None = None
+    slot: int | None = None
+
+    kind = 5
+
+    def accept(self, visitor):
+        return visitor.visit_variable_expr(self)
+
+
+@dataclass(slots=True)
+class Logical(Expr):
+    left: Expr
+    op: Token
+    right: Expr
+
+    kind = 6
+
+    def accept(self, visitor):
+        return visitor.visit_logical_expr(self)
+
+
+@dataclass(slots=True)
+class Assign(Expr):
+    name: Token
+    value: Expr
+    depth: int | None = None
+    slot: int | None = None
+
+    kind = 7
+
+    def accept(self, visitor):
+        return visitor.visit_assign_expr(self)
+
+
+class ExprVisitor:
+    def visit_binary_expr(self, expr: Binary):
+        pass
+
+    def visit_unary_expr(self, expr: Unary):
+        pass
+
+    def visit_call_expr(self, expr: Call):
+        pass
+
+    def visit_literal_expr(self, expr: Literal):
+        pass
+
+    def visit_grouping_expr(self, expr: Grouping):
+        pass
+
+    def visit_variable_expr(self, expr: Variable):
+        pass
+
+    def visit_logical_expr(self, expr: Logical):
+        pass
+
+    def visit_assign_expr(self, expr: Assign):
+        pass
+
+
+# Visit method names, indexed by kind
+EXPR_VISITS = (
+    "visit_binary_expr",
+    "visit_unary_expr",
+    "visit_call_expr",
+    "visit_literal_expr",
+    "visit_grouping_expr",
+    "visit_variable_expr",
+    "visit_logical_expr",
+    "visit_assign_expr",
+)
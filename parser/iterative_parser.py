@@ -0,0 +1,164 @@
+from parser.expr import Assign, Binary, Call, Expr, Grouping, Logical, Unary, Variable
+from parser.parser import Parser
+from scanner.token_type import TokenType as tt
+
+# Binding power of the infix operators, higher binds tighter.
+# The same ladder Parser climbs one method per level.
+PRECEDENCE = {
+    tt.EQUAL: 1,
+    tt.OR: 2,
+    tt.AND: 3,
+    tt.EQUAL_EQUAL: 4, tt.BANG_EQUAL: 4,
+    tt.GREATER: 5, tt.GREATER_EQUAL: 5, tt.LESS: 5, tt.LESS_EQUAL: 5,
+    tt.PLUS: 6, tt.MINUS: 6,
+    tt.STAR: 7, tt.SLASH: 7, tt.MODULO: 7,
+}
+
+# Prefix operators bind tighter than any infix one
+UNARY = 8
+
+LOGICAL = {tt.OR, tt.AND}
+
+# Markers for what an entry of the operator stack is
+INFIX, PREFIX, GROUP, CALL = range(4)
+
+
+class IterativeParser(Parser):
+    """
+    Parser whose expressions are parsed with explicit operator
+    and operand stacks (shunting-yard) instead of recursing
+    through one method per precedence level, so expressions can
+    be nested or chained as deep as memory allows.
+
+    Produces the same tree and reports the same errors as Parser.
+    Statements still nest through recursion, one Python frame
+    pair per level.
+    """
+
+    def expression(self):
+        operands: list[Expr] = []
+
+        # (marker, token, precedence or start of call arguments)
+        operators = []
+
+        # Markers of the parentheses still open, innermost last
+        parentheses = []
+
+        while True:
+            # An operand, after any number of prefix
+            # operators and opening parentheses
+            if self.match(tt.BANG, tt.MINUS):
+                operators.append((PREFIX, self.previous(), UNARY))
+                continue
+
+            if self.match(tt.LEFT_PAREN):
+                operators.append((GROUP, self.previous(), 0))
+                parentheses.append(GROUP)
+                continue
+
+            # Parentheses were matched above, so this never recurses
+            operands.append(self.primary())
+
+            # Then calls, closing parentheses and infix operators,
+            # until an operator or the end of the expression
+            while True:
+                if self.match(tt.LEFT_PAREN):
+                    if self.match(tt.RIGHT_PAREN):
+                        callee = operands.pop()
+                        operands.append(Call(callee, self.previous(), []))
+                        continue
+
+                    # Arguments pile up on the operands after the callee
+                    operators.append((CALL, self.previous(), len(operands)))
+                    parentheses.append(CALL)
+                    break
+
+                top = parentheses[-1] if parentheses else None
+
+                if self.check(tt.COMMA) and top == CALL:
+                    self.reduce_until_marker(operators, operands)
+                    self.advance()
+
+                    if len(operands) - operators[-1][2] >= 255:
+                        self.error(self.peek(),
+                                   "Can't have more than 255 arguments")
+                    break
+
+                if self.check(tt.RIGHT_PAREN) and top != None:
+                    self.reduce_until_marker(operators, operands)
+                    marker, _, start = operators.pop()
+                    parentheses.pop()
+                    self.advance()
+
+                    if marker == GROUP:
+                        operands.append(Grouping(operands.pop()))
+                    else:
+                        arguments = operands[start:]
+                        del operands[start:]
+                        callee = operands.pop()
+                        operands.append(Call(callee, self.previous(),
+                                             arguments))
+                    continue
+
+                precedence = PRECEDENCE.get(self.peek().type)
+
+                if precedence == None:
+                    return self.finish(operators, operands)
+
+                op = self.advance()
+
+                # Assignment is right associative, the rest left
+                if op.type == tt.EQUAL:
+                    self.reduce(operators, operands, precedence + 1)
+                else:
+                    self.reduce(operators, operands, precedence)
+
+                operators.append((INFIX, op, precedence))
+                break
+
+    def reduce(self, operators: list, operands: list[Expr], precedence: int):
+        """
+        Apply the operators on top of the stack
+        binding at least as tight as `precedence`
+        """
+        while operators and operators[-1][0] in (INFIX, PREFIX) \
+                and operators[-1][2] >= precedence:
+            self.apply(operators.pop(), operands)
+
+    def reduce_until_marker(self, operators: list, operands: list[Expr]):
+        while operators[-1][0] in (INFIX, PREFIX):
+            self.apply(operators.pop(), operands)
+
+    def apply(self, operator: tuple, operands: list[Expr]):
+        marker, op, _ = operator
+        right = operands.pop()
+
+        if marker == PREFIX:
+            operands.append(Unary(op, right))
+            return
+
+        left = operands.pop()
+
+        if op.type == tt.EQUAL:
+            if type(left) == Variable:
+                operands.append(Assign(left.name, right))
+            else:
+                self.error(op, "Invalid assignment target")
+                operands.append(left)
+
+        elif op.type in LOGICAL:
+            operands.append(Logical(left, op, right))
+
+        else:
+            operands.append(Binary(left, op, right))
+
+    def finish(self, operators: list, operands: list[Expr]):
+        self.reduce(operators, operands, 0)
+
+        if operators:
+            if operators[-1][0] == GROUP:
+                raise self.error(self.peek(), "Expected ')' after expression")
+
+            raise self.error(self.peek(), "Expected ')' after arguments")
+
+        return operands.pop()
@@ -1,6 +1,7 @@
 from ast import arg
+from typing import Iterable
 from unittest import mock
-from parser.expr import Assign, Binary, Call, Expr, Grouping, Literal, Logical, LoxCallable, Unary, Variable
+from parser.expr import Assign, Binary, Call, Expr, Grouping, Literal, Logical, Unary, Variable
 from parser.parsing_error import ParseError
 
 import lox
@@ -10,28 +11,48 @@ from scanner.token_type import TokenType as tt
 
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
-        self.current = 0
+    def __init__(self, tokens: Iterable[Token], reporter=None):
+        # Where errors go, anything with Lox's report and error
+        self.reporter = reporter if reporter != None else lox.Lox
 
-    def parse(self):
-        try:
-            statements = []
+        # Tokens are pulled one at a time, so they can come
+        # from a list or straight from Scanner.stream()
+        self.tokens = iter(tokens)
 
-            while not self.is_done():
-                statements.append(self.declaration())
+        self.next_token: Token = next(self.tokens)
+        self.previous_token: Token = None
 
-            return statements
+    def parse(self):
+        try:
+            return list(self.declarations())
         except ParseError:
             return None
 
+    def declarations(self):
+        """
+        Parse lazily, yielding top level
+        declarations as soon as they are parsed
+        """
+        while not self.is_done():
+            declaration = self.declaration()
+
+            if declaration != None:
+                yield declaration
+
     def declaration(self):
-        if self.match(tt.VAR):
-            return self.var_declaration()
-        if self.match(tt.FUN):
-            return self.function()
-        else:
-            return self.statement()
+        # A syntax error drops the declaration it's in,
+        # parsing picks up again at the next statement
+        try:
+            if self.match(tt.VAR):
+                return self.var_declaration()
+            if self.match(tt.FUN):
+                return self.function_declaration()
+            else:
+                return self.statement()
+
+        except ParseError:
+            self.synchronize()
+            return None
 
     def var_declaration(self):
         name = self.expect(tt.IDENTIFIER, "Expected variable name")
@@ -45,24 +66,29 @@ class Parser:
 
         return Var(name, initializer)
 
-    def function(self, kind):
-        name = self.expect(tt.IDENTIFIER, f"Expected {kind} name")
+    def function_declaration(self):
+        """
+        Functions aren't implemented: report the declaration
+        once and skip it, body included, so nothing in it
+        reports errors of its own
+        """
+        self.error(self.previous_token, "Functions aren't implemented")
+        depth = 0
 
-        arguments = []
-        self.expect(tt.RIGHT_PAREN,
-                    f"Expected '(' after {kind} name")
+        while not self.is_done():
+            token = self.advance()
 
-        while True:
-            arguments.append(self.expression())
+            if token.type == tt.LEFT_BRACE:
+                depth += 1
+            elif token.type == tt.RIGHT_BRACE:
+                depth -= 1
 
-            if not self.match(tt.SEMICOLON):
+                if depth <= 0:
+                    break
+            elif token.type == tt.SEMICOLON and depth == 0:
                 break
 
-        self.expect(tt.LEFT_BRACE, f"Expecred '{{' after {kind} arguments")
-
-        body = self.block()
-
-        return Function(name, body, arguments)
+        return None
 
     def statement(self):
         if self.match(tt.PRINT):
@@ -79,15 +105,17 @@ class Parser:
             return self.expression_statement()
 
     def while_statement(self):
+        keyword = self.previous()
         self.expect(tt.LEFT_PAREN, "Expected '(' after 'while'")
         condition = self.expression()
         self.expect(tt.RIGHT_PAREN, "Expected ')' after while loop condition")
 
         body = self.statement()
 
-        return While(condition, body)
+        return While(condition, body, keyword)
 
     def for_statement(self):
+        keyword = self.previous()
         self.expect(tt.LEFT_PAREN, "Expected '(' after 'for'")
 
         initializer = None
@@ -114,7 +142,7 @@ class Parser:
         if increment != None:
             body = Block([body, Expression(increment)])
 
-        body = While(condition or Literal(True), body)
+        body = While(condition or Literal(True), body, keyword)
 
         if initializer != None:
             body = Block([initializer, body])
@@ -243,7 +271,7 @@ class Parser:
 
         while True:
             if self.match(tt.LEFT_PAREN):
-                self.finish_call(expr)
+                expr = self.finish_call(expr)
             else:
                 break
 
@@ -258,14 +286,11 @@ class Parser:
                     self.error(
                         self.peek(), "Can't have more than 255 arguments")
 
-                arguments.add(self.expression())
+                arguments.append(self.expression())
 
                 if not self.match(tt.COMMA):
                     break
 
-        if len(arguments) != callee.arity():
-            self.error(self.callee, "")
-
         paren = self.expect(tt.RIGHT_PAREN,
                             "Expected ')' after arguments")
 
@@ -292,6 +317,8 @@ class Parser:
         elif self.match(tt.IDENTIFIER):
             return Variable(self.previous())
 
+        raise self.error(self.peek(), "Expected expression")
+
     def match(self, *expected: tt):
         if self.peek().type in expected:
             self.advance()
@@ -306,22 +333,23 @@ class Parser:
         if self.check(expected):
             return self.advance()
         else:
-            self.error(self.peek(), error)
+            raise self.error(self.peek(), error)
 
     def error(self, token: Token, message: str):
-        lox.Lox.error(token, message)
+        self.reporter.error(token, message)
         return ParseError()
 
     def advance(self):
         if not self.is_done():
-            self.current += 1
-            return self.previous()
+            self.previous_token = self.next_token
+            self.next_token = next(self.tokens)
+            return self.previous_token
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.next_token
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.previous_token
 
     def synchronize(self):
         self.advance()
@@ -342,7 +370,7 @@ class Parser:
             ]:
                 return
 
-        self.advance()
+            self.advance()
 
     def is_done(self):
         return self.peek().type == tt.EOF
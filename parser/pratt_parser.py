@@ -0,0 +1,132 @@
+from parser.expr import Assign, Binary, Grouping, Literal, Logical, Unary, Variable
+from parser.parser import Parser
+from scanner.token import Token
+from scanner.token_type import TokenType as tt
+
+# How tightly every infix operator binds to the
+# expression on its left, higher binds tighter
+BINDING_POWER = {
+    tt.EQUAL: 1,
+    tt.OR: 2,
+    tt.AND: 3,
+    tt.EQUAL_EQUAL: 4, tt.BANG_EQUAL: 4,
+    tt.GREATER: 5, tt.GREATER_EQUAL: 5, tt.LESS: 5, tt.LESS_EQUAL: 5,
+    tt.PLUS: 6, tt.MINUS: 6,
+    tt.STAR: 7, tt.SLASH: 7, tt.MODULO: 7,
+    # A call binds tighter than prefix operators
+    tt.LEFT_PAREN: 9,
+}
+
+# Binding power of the operand of prefix operators
+PREFIX_POWER = 8
+
+# Literals that are the same value for every token
+CONSTANTS = {tt.TRUE: True, tt.FALSE: False, tt.NIL: None}
+
+
+class PrattParser(Parser):
+    """
+    Parser whose expressions are parsed by precedence climbing:
+    one loop looks up what to do with a token in the prefix and
+    infix tables and how tightly it binds in BINDING_POWER,
+    instead of going down one method per precedence level for
+    every operand.
+
+    Produces the same tree and reports the same errors as Parser.
+    """
+
+    def __init__(self, tokens, reporter=None):
+        super().__init__(tokens, reporter)
+
+        # What to parse when a token starts an operand
+        self.prefix = {
+            tt.NUMBER: self.literal,
+            tt.STRING: self.literal,
+            tt.TRUE: self.constant,
+            tt.FALSE: self.constant,
+            tt.NIL: self.constant,
+            tt.IDENTIFIER: self.variable,
+            tt.LEFT_PAREN: self.grouping,
+            tt.BANG: self.unary_operator,
+            tt.MINUS: self.unary_operator,
+        }
+
+        # What to parse when a token follows an operand
+        self.infix = {
+            tt.EQUAL: self.assign,
+            tt.OR: self.logical,
+            tt.AND: self.logical,
+            tt.LEFT_PAREN: self.call_arguments,
+        }
+
+        for type, power in BINDING_POWER.items():
+            self.infix.setdefault(type, self.binary)
+
+    def expression(self):
+        return self.parse_expression(0)
+
+    def parse_expression(self, power: int):
+        """
+        Parse an operand and the infix operators after
+        it binding tighter than `power`
+        """
+        token = self.next_token
+        prefix = self.prefix.get(token.type)
+
+        if prefix == None:
+            raise self.error(token, "Expected expression")
+
+        # Neither table has EOF, so it's safe to step over the
+        # token without the end check in advance()
+        self.previous_token = token
+        self.next_token = next(self.tokens)
+
+        left = prefix(token)
+
+        while True:
+            token = self.next_token
+            binding = BINDING_POWER.get(token.type, 0)
+
+            if binding <= power:
+                return left
+
+            self.previous_token = token
+            self.next_token = next(self.tokens)
+
+            left = self.infix[token.type](left, token, binding)
+
+    def literal(self, token: Token):
+        return Literal(token.literal)
+
+    def constant(self, token: Token):
+        return Literal(CONSTANTS[token.type])
+
+    def variable(self, token: Token):
+        return Variable(token)
+
+    def grouping(self, token: Token):
+        expr = self.parse_expression(0)
+        self.expect(tt.RIGHT_PAREN, "Expected ')' after expression")
+        return Grouping(expr)
+
+    def unary_operator(self, token: Token):
+        return Unary(token, self.parse_expression(PREFIX_POWER))
+
+    def binary(self, left, token: Token, binding: int):
+        return Binary(left, token, self.parse_expression(binding))
+
+    def logical(self, left, token: Token, binding: int):
+        return Logical(left, token, self.parse_expression(binding))
+
+    def assign(self, left, token: Token, binding: int):
+        # Right associative, a = b = c assigns c to b first
+        value = self.parse_expression(binding - 1)
+
+        if type(left) == Variable:
+            return Assign(left.name, value)
+
+        self.error(token, "Invalid assignment target")
+        return left
+
+    def call_arguments(self, callee, token: Token, binding: int):
+        return self.finish_call(callee)
@@ -0,0 +1,110 @@
+import hashlib
+from importlib.util import find_spec
+import os
+from os import path
+import pickle
+
+# Modules shaping the cached trees: the node classes, and
+# the passes that run before caching
+SCHEMA_MODULES = ("parser.expr", "parser.stmt", "interpreter.resolver",
+                  "interpreter.optimizer")
+
+
+def schema_digest():
+    """
+    Hash of the sources of SCHEMA_MODULES, any edit to them
+    changes every key so stale caches are never loaded
+    """
+    hasher = hashlib.sha256()
+
+    for name in SCHEMA_MODULES:
+        with open(find_spec(name).origin, "rb") as file:
+            hasher.update(file.read())
+
+    return hasher.digest()
+
+
+SCHEMA = schema_digest()
+
+MAGIC = b"LOXC"
+
+
+class ProgramCache:
+    """
+    Keeps prepared (parsed, and optionally optimized and
+    resolved) programs on disk, like __pycache__ does for
+    Python. An entry is only used if it was written for the
+    same source and options, by the same node classes
+    and passes.
+
+    Entries live in `__loxcache__` next to the script, or
+    in `directory` when one is given.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+
+    def entry_path(self, script: str, options: str = ""):
+        script = path.abspath(script)
+        directory = self.directory or path.join(path.dirname(script),
+                                                "__loxcache__")
+
+        # Scripts with the same name in different directories
+        # can share a relocated cache directory
+        digest = hashlib.sha256(script.encode()).hexdigest()[:12]
+        stem = path.splitext(path.basename(script))[0]
+
+        if options:
+            stem = f"{stem}.{options}"
+
+        return path.join(directory, f"{stem}.{digest}.loxc")
+
+    def key(self, source: str, options: str):
+        hasher = hashlib.sha256()
+        hasher.update(SCHEMA)
+        hasher.update(f"{options}\0".encode())
+        hasher.update(source.encode())
+        return hasher.digest()
+
+    def load(self, script: str, source: str, options: str = ""):
+        """
+        Returns the cached tree, or None if there is
+        no valid entry for this source
+        """
+        header = MAGIC + self.key(source, options)
+
+        try:
+            with open(self.entry_path(script, options), "rb") as file:
+                if file.read(len(header)) != header:
+                    return None
+
+                return pickle.load(file)
+
+        except (OSError, pickle.UnpicklingError, EOFError,
+                AttributeError, ImportError, RecursionError):
+            return None
+
+    def store(self, script: str, source: str, tree, options: str = ""):
+        """
+        Write the tree to the cache. Failing to cache
+        is never an error, the program just gets parsed
+        again next time.
+        """
+        entry = self.entry_path(script, options)
+        temporary = f"{entry}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(path.dirname(entry), exist_ok=True)
+
+            with open(temporary, "wb") as file:
+                file.write(MAGIC + self.key(source, options))
+                pickle.dump(tree, file, pickle.HIGHEST_PROTOCOL)
+
+            # Readers never see a half written entry
+            os.replace(temporary, entry)
+
+        except (OSError, pickle.PicklingError, RecursionError):
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from parser.expr import Expr
+from parser.expr import EXPR_VISITS, Expr
 from scanner.token import Token
 
 
@@ -12,90 +12,151 @@ class LoxCallable:
 
 
 class Stmt:
+    __slots__ = ()
+
+    kind = -1
+
     def accept(self, visitor):
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Var(Stmt):
     name: Token
     initializer: Expr
+    slot: int | None = None
+
+    kind = 8
 
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression(Stmt):
     expr: Expr
 
+    kind = 9
+
     def accept(self, visitor):
         return visitor.visit_expression_stmt(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Print(Stmt):
     expr: Expr
 
+    kind = 10
+
     def accept(self, visitor):
         return visitor.visit_print_stmt(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Stmt):
     statements: list[Stmt]
+    slots: int = 0
+
+    kind = 11
 
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class If(Stmt):
     condition: Expr
     thenBranch: Stmt
     elseBranch: Stmt | None
 
+    kind = 12
+
     def accept(self, visitor):
         return visitor.visit_if_stmt(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class While(Stmt):
     condition: Expr
     body: Stmt
+    keyword: Token | None = None
+
+    kind = 13
 
     def accept(self, visitor):
         return visitor.visit_while_stmt(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class Function(Stmt):
     name: Token
     body: list[Stmt]
     arguments: list[Expr]
 
+    kind = 14
+
     def accept(self, visitor):
-        return visitor.visit_unary_expr(self)
+        return visitor.visit_function_stmt(self)
+
+
+@dataclass(slots=True)
+class ForRange(Stmt):
+    loop: While
+    body: Stmt
+    step: float
+
+    kind = 15
+
+    def accept(self, visitor):
+        return visitor.visit_forrange_stmt(self)
 
 
 class StmtVisitor:
-    def visit_expression_stmt(self, expr: Expression):
+    def visit_var_stmt(self, stmt: Var):
         pass
 
-    def visit_print_stmt(self, expr: Print):
+    def visit_expression_stmt(self, stmt: Expression):
         pass
 
-    def visit_var_stmt(self, expr: Var):
+    def visit_print_stmt(self, stmt: Print):
         pass
 
-    def visit_block_stmt(self, expr: Block):
+    def visit_block_stmt(self, stmt: Block):
         pass
 
-    def visit_if_stmt(self, expr: If):
+    def visit_if_stmt(self, stmt: If):
         pass
 
-    def visit_while_stmt(self, expr: While):
+    def visit_while_stmt(self, stmt: While):
         pass
 
-    def visit_function_stmt(self, expr: Function):
+    def visit_function_stmt(self, stmt: Function):
         pass
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        pass
+
+
+# Visit method names, indexed by kind - 8
+STMT_VISITS = (
+    "visit_var_stmt",
+    "visit_expression_stmt",
+    "visit_print_stmt",
+    "visit_block_stmt",
+    "visit_if_stmt",
+    "visit_while_stmt",
+    "visit_function_stmt",
+    "visit_forrange_stmt",
+)
+
+
+# Visit method names of every node, indexed by kind
+NODE_VISITS = EXPR_VISITS + STMT_VISITS
+
+
+def dispatch_table(visitor):
+    """
+    Returns the bound visit methods of `visitor`,
+    so `table[node.kind](node)` replaces `node.accept`
+    """
+    return [getattr(visitor, name) for name in NODE_VISITS]
@@ -0,0 +1,188 @@
+import re
+import sys
+from scanner.keywords import KEYWORDS as kwds
+from scanner.token import Token
+from scanner.token_buffer import TokenBuffer
+import lox
+from scanner.token_type import TokenType as tt
+
+# Matches one lexeme at a time, skipping the spaces before it.
+# Identifiers are letters only, like in Scanner, where a digit
+# ends an identifier. A string missing its closing quote runs
+# to the end of the source. The last alternative excludes
+# blanks, so trailing blanks at the end of the source match
+# nothing instead of being reported as unexpected characters.
+LEXEME = re.compile(r"""
+    [ \t\r]*
+    ( \n
+    | //[^\n]*
+    | \d+(?:\.\d+)?
+    | [^\W\d_]+
+    | "[^"]*"?
+    | [!=<>]=
+    | [^ \t\r]
+    )
+""", re.VERBOSE)
+
+OPERATORS = {
+    "(": tt.LEFT_PAREN,
+    ")": tt.RIGHT_PAREN,
+    "{": tt.LEFT_BRACE,
+    "}": tt.RIGHT_BRACE,
+    ",": tt.COMMA,
+    ".": tt.DOT,
+    "-": tt.MINUS,
+    "+": tt.PLUS,
+    "%": tt.MODULO,
+    ";": tt.SEMICOLON,
+    "*": tt.STAR,
+    "/": tt.SLASH,
+    "!": tt.BANG,
+    "!=": tt.BANG_EQUAL,
+    "=": tt.EQUAL,
+    "==": tt.EQUAL_EQUAL,
+    "<": tt.LESS,
+    "<=": tt.LESS_EQUAL,
+    ">": tt.GREATER,
+    ">=": tt.GREATER_EQUAL,
+}
+
+# Lexemes whose token type only depends on their text
+FIXED = {**OPERATORS, **kwds}
+
+
+class RegexScanner:
+    """
+    Splits the source code into tokens with a single compiled
+    regular expression instead of one character at a time.
+
+    The regex engine cuts the whole source into lexemes in one
+    call, leaving only a dict lookup per lexeme to classify it.
+    Produces the same tokens and reports the same errors as
+    Scanner.
+    """
+
+    def __init__(self, source: str, reporter=None):
+        self.source = source
+        self.reporter = reporter if reporter != None else lox.Lox
+        self.tokens = []
+        self.line = 1
+
+    def scan(self):
+        """
+        Scan the entire source code
+        """
+        self.tokens.extend(self.classify(LEXEME.findall(self.source)))
+        return self.tokens
+
+    def stream(self):
+        """
+        Scan the source code lazily, yielding
+        tokens as soon as they are scanned
+        """
+        return self.classify(match.group(1)
+                             for match in LEXEME.finditer(self.source))
+
+    def classify(self, lexemes):
+        """
+        Turn lexemes into tokens, followed by the EOF token
+        """
+        fixed = FIXED
+        line = self.line
+
+        for text in lexemes:
+            kind = fixed.get(text)
+
+            if kind != None:
+                yield Token(kind, text, None, line)
+
+            elif text == "\n":
+                line += 1
+
+            elif text[0] == "/":
+                # Comment, a lone slash is in FIXED
+                pass
+
+            elif text[0] == '"':
+                # Strings can span lines, the token gets
+                # the line the string ends on
+                line += text.count("\n")
+
+                if len(text) > 1 and text[-1] == '"':
+                    yield Token(tt.STRING, text, text[1:-1], line)
+                else:
+                    self.reporter.report(line, None, "Unterminated string")
+
+            elif text[0].isdigit():
+                yield Token(tt.NUMBER, text, float(text), line)
+
+            elif text[0].isalnum():
+                yield Token(tt.IDENTIFIER, sys.intern(text), None, line)
+
+            else:
+                self.reporter.report(line, None,
+                                     f"Unexpected character '{text}'")
+
+        self.line = line
+
+        # Add the EOF token
+        yield Token(tt.EOF, '', None, line)
+
+
+class CompactScanner(RegexScanner):
+    """
+    RegexScanner producing a TokenBuffer instead of a list of
+    Token objects, for sources too large to hold as objects
+    """
+
+    def scan(self):
+        """
+        Scan the entire source code
+        """
+        source = self.source
+        buffer = TokenBuffer(source)
+        append = buffer.append
+        newlines = buffer.newlines
+        fixed = FIXED
+
+        for match in LEXEME.finditer(source):
+            text = match.group(1)
+            start = match.start(1)
+            kind = fixed.get(text)
+
+            if kind != None:
+                append(kind, start, len(text))
+
+            elif text == "\n":
+                newlines.append(start)
+
+            elif text[0] == "/":
+                # Comment, a lone slash is in FIXED
+                pass
+
+            elif text[0] == '"':
+                newline = text.find("\n")
+
+                while newline != -1:
+                    newlines.append(start + newline)
+                    newline = text.find("\n", newline + 1)
+
+                if len(text) > 1 and text[-1] == '"':
+                    append(tt.STRING, start, len(text))
+                else:
+                    self.reporter.report(len(newlines) + 1, None,
+                                         "Unterminated string")
+
+            elif text[0].isdigit():
+                append(tt.NUMBER, start, len(text))
+
+            elif text[0].isalnum():
+                append(tt.IDENTIFIER, start, len(text))
+
+            else:
+                self.reporter.report(len(newlines) + 1, None,
+                                     f"Unexpected character '{text}'")
+
+        # Add the EOF token
+        append(tt.EOF, len(source), 0)
+        return buffer
@@ -1,3 +1,4 @@
+import sys
 from scanner.keywords import KEYWORDS as kwds
 from scanner.token import Token
 import lox
@@ -9,10 +10,13 @@ class Scanner:
     Splits the source code into tokens
     """
 
-    def __init__(self, source: str):
+    def __init__(self, source: str, reporter=None):
         # The full source code
         self.source = source
 
+        # Where errors go, anything with Lox's report and error
+        self.reporter = reporter if reporter != None else lox.Lox
+
         # The tokens previously scanned
         self.tokens = []
 
@@ -39,6 +43,23 @@ class Scanner:
         self.tokens.append(Token(tt.EOF, '', None, self.line))
         return self.tokens
 
+    def stream(self):
+        """
+        Scan the source code lazily, yielding
+        tokens as soon as they are scanned
+        """
+        while not self.is_done():
+            self.start = self.current
+            self.scan_token()
+
+            # scan_token adds at most one token,
+            # so the buffer never grows past that
+            if self.tokens:
+                yield from self.tokens
+                self.tokens.clear()
+
+        yield Token(tt.EOF, '', None, self.line)
+
     def scan_token(self):
         """
         Scan a single token
@@ -119,7 +140,8 @@ class Scanner:
                 self.advance()
 
             if self.is_done():
-                lox.Lox.report(self.line, None, "Unterminated string")
+                self.reporter.report(self.line, None, "Unterminated string")
+                return
 
             # Ending "
             self.advance()
@@ -148,15 +170,20 @@ class Scanner:
             while self.peek().isalpha():
                 self.advance()
 
-            keyword = kwds.get(self.source[self.start:self.current])
+            text = self.source[self.start:self.current]
+            keyword = kwds.get(text)
 
             if keyword == None:
-                keyword = tt.IDENTIFIER
-
-            self.add_token(keyword)
+                # Interned so environment lookups
+                # can compare names by identity
+                self.tokens.append(Token(tt.IDENTIFIER, sys.intern(text),
+                                         None, self.line))
+            else:
+                self.add_token(keyword)
 
         else:
-            lox.Lox.report(self.line, None, f"Unexpected character '{c}'")
+            self.reporter.report(self.line, None,
+                                 f"Unexpected character '{c}'")
 
     def peek(self):
         """
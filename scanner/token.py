@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from scanner.token_type import TokenType as tt
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: tt
     lexeme: str
@@ -0,0 +1,70 @@
+from array import array
+from bisect import bisect_right
+import sys
+from scanner.token import Token
+from scanner.token_type import TokenType as tt
+
+TYPES = list(tt)
+TYPE_CODES = {type: code for code, type in enumerate(TYPES)}
+
+
+class TokenBuffer:
+    """
+    Memory-lean token list: instead of one Token object per
+    token, types, start offsets and lengths are kept in parallel
+    arrays.
+
+    Lexemes, literals and line numbers aren't stored, they are
+    recomputed from the source when a Token is materialized,
+    lines from the offsets of the newlines in the source.
+    Iterating or indexing builds Token objects on demand, so
+    the buffer can be handed to Parser as is.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.lengths = array("I")
+
+        # Offsets of every newline in the source, in order
+        self.newlines = array("I")
+
+    def append(self, type: tt, start: int, length: int):
+        self.types.append(TYPE_CODES[type])
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def line(self, index: int):
+        """
+        Line of a token, which for strings spanning
+        several lines is the line they end on
+        """
+        end = self.starts[index] + max(self.lengths[index] - 1, 0)
+        return bisect_right(self.newlines, end) + 1
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+
+        type = TYPES[self.types[index]]
+        start = self.starts[index]
+        lexeme = self.source[start:start + self.lengths[index]]
+
+        literal = None
+
+        if type == tt.IDENTIFIER:
+            lexeme = sys.intern(lexeme)
+        elif type == tt.NUMBER:
+            literal = float(lexeme)
+        elif type == tt.STRING:
+            literal = lexeme[1:-1]
+
+        return Token(type, lexeme, literal, self.line(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,36 @@
+# lox first, the parser modules import it back
+import lox
+import embed
+from parser.arena import Arena
+import pytest
+
+SOURCE = """
+var a = "one";
+{ var b = 2; print a + " " + "two"; print b * 3; }
+"""
+
+
+@pytest.fixture
+def arena_bytes(tmp_path):
+    path = tmp_path / "program.loxa"
+    Arena.from_tree(embed.compile(SOURCE).tree).write(str(path))
+    return path.read_bytes()
+
+
+def test_round_trip(tmp_path, arena_bytes):
+    path = tmp_path / "copy.loxa"
+    path.write_bytes(arena_bytes)
+    arena = Arena.load(str(path))
+
+    assert arena.root_count == 2
+    assert "one" in arena.literals
+
+
+def test_truncated_arena_is_value_error(tmp_path, arena_bytes):
+    path = tmp_path / "truncated.loxa"
+
+    for length in range(1, len(arena_bytes)):
+        path.write_bytes(arena_bytes[:length])
+
+        with pytest.raises(ValueError):
+            Arena.load(str(path))
@@ -0,0 +1,107 @@
+# lox first, embed imports it back
+import lox
+import embed
+import io
+from interpreter.optimizer import Optimizer
+from parser.ast_printer import AstPrinter
+from parser.parser import Parser
+import pytest
+from scanner.scanner import Scanner
+
+ENGINES = list(lox.ENGINES)
+
+# Loops the optimizer turns into a ForRange, or has to leave
+# alone, which must print and fail the same either way
+SOURCES = {
+    "fractional <=": """
+        { var i = 0; while (i <= 1) { print i; i = i + 0.1; } }
+        { var i = 0.5; while (i <= 2.5) { print i; i = i + 0.5; } }
+    """,
+    "string bound": """
+        { var n = "3"; var i = 0; while (i < n) { print i; i = i + 1; } }
+    """,
+    "global counter": """
+        var i = 0;
+        while (i < 3) { print i; i = i + 1; }
+        print i;
+        for (var j = 0; j < 2; j = j + 1) print j;
+    """,
+    "body reassigns the counter": """
+        {
+            var i = 0;
+            while (i < 10) { print i; i = i * 2; i = i + 1; }
+            var n = 4;
+            var k = 0;
+            while (k < n) { { n = n - 1; } print k; k = k + 1; }
+            print n;
+        }
+    """,
+    "global named like a counter": """
+        { var i = 0; while (i < 3) { print i; i = i + 1; } }
+        var i = nil;
+        { var k = 0; while (k < 1) { print k; k = k + 1; } }
+    """,
+    "body declares": """
+        {
+            var i = 0;
+            while (i < 3) { var j = i * 2; { var k = j; print k; } i = i + 1; }
+            for (var n = 0; n < 2; n = n + 1) { var m = n; print m; }
+        }
+    """,
+}
+
+
+def printed(tree):
+    output = io.StringIO()
+    AstPrinter().print_program(tree, output)
+    return output.getvalue()
+
+
+def test_counted_loop_keeps_its_block():
+    source = "{ var i = 0; while (i < 3) { var j = i; print j; i = i + 1; } }"
+    tree = Optimizer().optimize(Parser(Scanner(source).scan()).parse())
+
+    assert printed(tree) == (
+        "(block (var i 0.0) (for-range 1.0 (while (< i 3.0) "
+        "(block (var j i) (print j) (; (= i (+ i 1.0)))))))\n")
+
+
+def run(source: str, engine: str, optimize: bool, steps: int = None):
+    """
+    What the program printed, the error it stopped with
+    and the steps it took
+    """
+    stdout = embed.Output.capture()
+    budget = embed.Budget(steps=steps)
+    error = None
+
+    try:
+        embed.compile(source, engine, optimize).run(stdout=stdout,
+                                                    budget=budget)
+    except embed.LoxRuntimeError as failure:
+        error = (failure.message, failure.token.line)
+
+    return stdout.getvalue(), error, budget.used
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", SOURCES)
+def test_same_output_with_and_without_optimizer(name, engine):
+    source = SOURCES[name]
+    assert run(source, engine, True) == run(source, engine, False)
+    assert run(source, engine, False) == run(source, "tree", False)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("steps", [0, 1, 2, 5, 9, 10, 11])
+def test_budget_charged_at_the_same_point(engine, steps):
+    source = """
+        var total = 0;
+        { var i = 0; while (i < 10) { print i; i = i + 1; } }
+        for (var i = 0; i < 2; i = i + 0.5) total = total + i;
+        print total;
+    """
+    assert run(source, engine, True, steps) \
+        == run(source, engine, False, steps)
+    assert run(source, engine, True, steps) \
+        == run(source, "tree", False, steps)
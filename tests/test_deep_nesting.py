@@ -0,0 +1,30 @@
+# lox first, embed imports it back
+import lox
+import embed
+import pytest
+
+DEPTH = 20000
+
+# Generated sources nested far past Python's recursion limit
+SOURCES = {
+    "groupings": ("print " + "(" * DEPTH + "1" + ")" * DEPTH + ";", "1\n"),
+    "unary": ("var a = 1; print " + "-" * DEPTH + "a;", "1\n"),
+    "chain": ("var a = 1; print " + " + ".join(["a"] * DEPTH) + ";",
+              f"{DEPTH}\n"),
+    "folded chain": ("print " + " + ".join(["1"] * DEPTH) + ";",
+                     f"{DEPTH}\n"),
+    "right nested": ("var a = 1; print " + "1 + (" * DEPTH + "a"
+                     + ")" * DEPTH + ";", f"{DEPTH + 1}\n"),
+}
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("name", SOURCES)
+def test_iterative_parser_and_stack_engine(name, optimize):
+    source, expected = SOURCES[name]
+    stdout = embed.Output.capture()
+
+    embed.compile(source, "stack", optimize,
+                  parser="iterative").run(stdout=stdout)
+
+    assert stdout.getvalue() == expected
@@ -0,0 +1,93 @@
+# lox first, embed imports it back
+import lox
+import embed
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+
+class WriteOnly:
+    """
+    Sink with a write() and nothing else
+    """
+
+    def __init__(self):
+        self.text = ""
+
+    def write(self, text: str):
+        self.text += text
+
+
+@pytest.mark.parametrize("engine", list(lox.ENGINES))
+def test_write_only_stdout(engine):
+    stdout = WriteOnly()
+    embed.compile("print 1; print \"a\";", engine).run(stdout=stdout)
+
+    assert stdout.text == "1\na\n"
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_dead_code_is_still_resolved(optimize):
+    source = "if (true) print 1; else { var i = !i; }"
+
+    with pytest.raises(embed.CompileError):
+        embed.compile(source, optimize=optimize)
+
+
+SOURCE = """
+var total = 0;
+var i = 0;
+while (i < count) { { var step = i * 2; total = total + step; } i = i + 1; }
+print total;
+"""
+
+
+def run(program, count: int, steps: int = None):
+    stdout = embed.Output.capture()
+    budget = embed.Budget(steps=steps) if steps != None else None
+
+    try:
+        result = program.run({"count": count}, stdout=stdout, budget=budget)
+    except embed.BudgetExceeded as error:
+        return stdout.getvalue(), error.steps
+
+    return stdout.getvalue(), result["total"]
+
+
+@pytest.mark.parametrize("engine", list(lox.ENGINES))
+def test_compiled_once_run_many(engine, monkeypatch):
+    program = embed.compile(SOURCE, engine)
+
+    def compile_again(*args):
+        raise AssertionError("compiled on run")
+
+    for engine_class in lox.ENGINES.values():
+        monkeypatch.setattr(engine_class, "compile_program", compile_again)
+
+    assert run(program, 3) == ("6\n", 6.0)
+    assert run(program, 5) == ("20\n", 20.0)
+    assert run(program, 5, steps=2) == ("", 2)
+    assert run(program, 4, steps=10) == ("12\n", 12.0)
+    assert run(program, 3) == ("6\n", 6.0)
+
+
+@pytest.mark.parametrize("engine", list(lox.ENGINES))
+def test_runs_from_threads(engine):
+    program = embed.compile(SOURCE, engine)
+    counts = list(range(40))
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda count: run(program, count), counts))
+
+    assert results == [(f"{count * (count - 1)}\n", count * (count - 1.0))
+                       for count in counts]
+
+
+@pytest.mark.parametrize("parser", list(lox.PARSERS))
+def test_function_declarations_are_one_error(parser):
+    source = "print 1;\nfun f(a) { if (a) { print a; } }\nprint 2;"
+
+    with pytest.raises(embed.CompileError) as error:
+        embed.compile(source, parser=parser)
+
+    assert [str(diagnostic) for diagnostic in error.value.diagnostics] \
+        == ["[line 2] Error at 'fun': Functions aren't implemented"]
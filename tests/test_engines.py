@@ -0,0 +1,69 @@
+# lox first, embed imports it back
+import lox
+import embed
+import pytest
+
+ENGINES = list(lox.ENGINES)
+
+# Programs every engine must print the same for
+SOURCES = {
+    "assign in own initializer": """
+        { var c = (c = 1) + 2; print c; }
+    """,
+    "nested assign in own initializer": """
+        {
+            var a = 1;
+            {
+                var b = 2;
+                var c = b + (c = a + 3) * (a + b);
+                print c;
+                var d;
+                var e = d = (e = 4) + a;
+                print d; print e;
+            }
+            print a;
+        }
+    """,
+    "global in own initializer": """
+        print 0;
+        var g = (g = 5) + 1;
+        print g;
+    """,
+    "constant right operands": """
+        var a = 7;
+        print a + 1; print a - 1; print a * 2; print a / 2; print a % 4;
+        print a < 7; print a <= 7; print a > 7; print a >= 7;
+        print a == 7; print a != 7; print "x" + "y"; print a + "y";
+        { var b = a; b = b * 3; print b; }
+    """,
+    "division by constant 0": """
+        var a = 1;
+        print a / 0;
+    """,
+    "comparison with constant string": """
+        var a = 1;
+        print a < "b";
+    """,
+    "store to undefined global": """
+        print 1;
+        missing = 2;
+    """,
+}
+
+
+def run(source: str, engine: str):
+    stdout = embed.Output.capture()
+    error = None
+
+    try:
+        embed.compile(source, engine).run(stdout=stdout)
+    except embed.LoxRuntimeError as failure:
+        error = (failure.message, failure.token.line)
+
+    return stdout.getvalue(), error
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", SOURCES)
+def test_same_as_tree(name, engine):
+    assert run(SOURCES[name], engine) == run(SOURCES[name], "tree")
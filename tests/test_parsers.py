@@ -0,0 +1,69 @@
+# lox first, the parser modules import it back
+import lox
+import io
+from embed import DiagnosticList
+import os
+from os import path
+from parser.ast_printer import AstPrinter
+from parser.iterative_parser import IterativeParser
+from parser.parser import Parser
+from parser.pratt_parser import PrattParser
+from scanner.scanner import Scanner
+import pytest
+
+PROGRAMS = path.join(path.dirname(__file__), "..", "benchmarks", "programs")
+
+BENCHMARKS = sorted(name for name in os.listdir(PROGRAMS)
+                    if name.endswith(".lox"))
+
+# Programs with syntax errors, parsers must report the same
+# errors and recover into the same tree
+ERRORS = [
+    "print 1",
+    "print (1 + 2;",
+    "var = 1;",
+    "var a = ;",
+    "1 + 2 = 3;",
+    "a + b = c; print a;",
+    "{ print 1;",
+    "print 1; } print 2;",
+    "if (true print 1;",
+    "while true) print 1;",
+    "for (var i = 0; i < 3) print i;",
+    "fun f() { print 1; } print 2;",
+    "print -;",
+    "print !;",
+    "print 1 +;",
+    "print 1 or;",
+    "print a = 1 = ;",
+    "var a = 1; print a; print (a; var b = 2; print b;",
+    "print 1 < 2 < ;",
+    ")",
+]
+
+
+def parse(parser_class, source: str):
+    errors = DiagnosticList()
+    tree = parser_class(Scanner(source, errors).scan(), errors).parse()
+    output = io.StringIO()
+    AstPrinter().print_program([stmt for stmt in tree if stmt != None],
+                               output)
+    return output.getvalue(), errors.diagnostics
+
+
+@pytest.mark.parametrize("parser_class", [IterativeParser, PrattParser])
+@pytest.mark.parametrize("name", BENCHMARKS)
+def test_same_tree_for_benchmarks(parser_class, name):
+    with open(path.join(PROGRAMS, name)) as file:
+        source = file.read()
+
+    assert parse(parser_class, source) == parse(Parser, source)
+
+
+@pytest.mark.parametrize("parser_class", [IterativeParser, PrattParser])
+@pytest.mark.parametrize("source", ERRORS)
+def test_same_errors(parser_class, source):
+    tree, errors = parse(Parser, source)
+
+    assert errors
+    assert parse(parser_class, source) == (tree, errors)
@@ -0,0 +1,62 @@
+# lox first, the parser modules import it back
+import lox
+import io
+import pickle
+from parser import program_cache
+from parser.ast_printer import AstPrinter
+from parser.parser import Parser
+from parser.program_cache import ProgramCache
+from scanner.scanner import Scanner
+
+SOURCE = "var a = 1; { var b = a + 2; print b; } print a;"
+
+
+def prepared(source: str):
+    return lox.Lox().prepare(Parser(Scanner(source).scan()).parse())
+
+
+def printed(tree):
+    output = io.StringIO()
+    AstPrinter().print_program(tree, output)
+    return output.getvalue()
+
+
+def test_hit(tmp_path):
+    cache = ProgramCache(str(tmp_path))
+    script = str(tmp_path / "a.lox")
+    tree = prepared(SOURCE)
+    cache.store(script, SOURCE, tree, "optimize")
+
+    assert printed(cache.load(script, SOURCE, "optimize")) == printed(tree)
+
+
+def test_miss(tmp_path):
+    cache = ProgramCache(str(tmp_path))
+    script = str(tmp_path / "a.lox")
+    cache.store(script, SOURCE, prepared(SOURCE))
+
+    assert cache.load(str(tmp_path / "b.lox"), SOURCE) == None
+    assert cache.load(script, SOURCE + " print 2;") == None
+    assert cache.load(script, SOURCE, "optimize") == None
+
+
+def test_schema_change_invalidates(tmp_path, monkeypatch):
+    cache = ProgramCache(str(tmp_path))
+    script = str(tmp_path / "a.lox")
+    cache.store(script, SOURCE, prepared(SOURCE))
+    monkeypatch.setattr(program_cache, "SCHEMA", b"edited node classes")
+
+    assert cache.load(script, SOURCE) == None
+
+
+def test_unloadable_entry_is_a_miss(tmp_path, monkeypatch):
+    cache = ProgramCache(str(tmp_path))
+    script = str(tmp_path / "a.lox")
+    cache.store(script, SOURCE, prepared(SOURCE))
+
+    def too_deep(file):
+        raise RecursionError
+
+    monkeypatch.setattr(pickle, "load", too_deep)
+
+    assert cache.load(script, SOURCE) == None
@@ -0,0 +1,38 @@
+# lox first, the scanner modules import it back
+import lox
+from embed import DiagnosticList
+from scanner.regex_scanner import CompactScanner, RegexScanner
+from scanner.scanner import Scanner
+import pytest
+
+SOURCES = [
+    "print 1; ",
+    "print 1;\t",
+    "print 1; \t \r",
+    "print 1;\n  ",
+    "var a = 1;   \n print a;  \t",
+    "   ",
+    "",
+    "print @; ",
+]
+
+
+def scan(scanner_class, source: str):
+    errors = DiagnosticList()
+    tokens = [(token.type, token.lexeme, token.literal, token.line)
+              for token in scanner_class(source, errors).scan()]
+    return tokens, errors.diagnostics
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("scanner_class", [RegexScanner, CompactScanner])
+def test_same_tokens_and_errors_as_scanner(scanner_class, source):
+    assert scan(scanner_class, source) == scan(Scanner, source)
+
+
+@pytest.mark.parametrize("scanner_class", [RegexScanner, CompactScanner])
+def test_trailing_blanks_without_newline(scanner_class):
+    tokens, errors = scan(scanner_class, "print 1; \t")
+
+    assert errors == []
+    assert [lexeme for _, lexeme, _, _ in tokens] == ["print", "1", ";", ""]
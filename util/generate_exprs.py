@@ -1,68 +1,150 @@
 # Dingus program
+#
+# Generates parser/expr.py and parser/stmt.py from grammar files.
+#
+# Every line of a grammar is one of:
+#   # comment            skipped
+#   >text                copied to the top of the output as is
+#   Name | field: Type   a node, fields separated by two spaces,
+#                        fields can have a default after a "="
+#
+# Nodes are slotted dataclasses with a small integer `kind`,
+# numbered across all the grammars given, so a visitor can
+# dispatch by indexing a table instead of calling accept.
 
 from os import path
 import os
 import sys
 
 
-def wl(file, line, indent=0):
-    file.write(f"{' ' * indent * 4}{line}\n")
+def wl(file, line="", indent=0):
+    file.write(f"{' ' * indent * 4}{line}\n" if line else "\n")
 
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: python generate_exprs.py [output_dir] [grammar]")
-        exit(1)
+def read_grammar(grammar_path):
+    header = []
+    nodes = []
 
-    print("Generating ast...")
+    with open(grammar_path) as infile:
+        for line in infile.readlines():
+            if line.strip().startswith("#") or not line.strip():
+                continue
+
+            if line.strip().startswith(">"):
+                header.append(line.rstrip("\n")[1:])
+                continue
+
+            prod, fields = [l.strip() for l in line.split("|", 1)]
+            nodes.append((prod, fields.split("  ")))
+
+    return header, nodes
+
+
+def generate(outfile, base, header, nodes, first_kind):
+    suffix = base.lower()
+
+    for line in header:
+        wl(outfile, line)
+
+    wl(outfile)
+    wl(outfile)
+    wl(outfile, f"class {base}:")
+    wl(outfile, "__slots__ = ()", 1)
+    wl(outfile)
+    wl(outfile, "kind = -1", 1)
+    wl(outfile)
+    wl(outfile, "def accept(self, visitor):", 1)
+    wl(outfile, "pass", 2)
+
+    for kind, (prod, fields) in enumerate(nodes, first_kind):
+        wl(outfile)
+        wl(outfile)
+        wl(outfile, "@dataclass(slots=True)")
+        wl(outfile, f"class {prod}({base}):")
+
+        for field in fields:
+            wl(outfile, field.strip(), 1)
+
+        wl(outfile)
+        wl(outfile, f"kind = {kind}", 1)
+        wl(outfile)
+        wl(outfile, "def accept(self, visitor):", 1)
+        wl(outfile, f"return visitor.visit_{prod.lower()}_{suffix}(self)", 2)
 
-    with open(sys.argv[2]) as infile:
-        with open(path.join(sys.argv[1], "expr.py"), 'w') as outfile:
-            wl(outfile, "from dataclasses import dataclass")
-            wl(outfile, "from scanner.token import Token")
+    wl(outfile)
+    wl(outfile)
+    wl(outfile, f"class {base}Visitor:")
 
-            wl(outfile, "class Expr:")
-            wl(outfile, "def accept(self, visitor):", 1)
-            wl(outfile, "pass", 2)
+    for i, (prod, fields) in enumerate(nodes):
+        if i:
+            wl(outfile)
 
-            for line in infile.readlines():
-                if line.strip().startswith("#"):
-                    continue
+        wl(outfile,
+           f"def visit_{prod.lower()}_{suffix}(self, {suffix}: {prod}):", 1)
+        wl(outfile, "pass", 2)
 
-                if line.strip().startswith(">"):
-                    wl(outfile, line.lstrip(">"))
-                    continue
-                
-                prod, fields = [l.strip() for l in line.split("|")]
+    wl(outfile)
+    wl(outfile)
 
-                wl(outfile, "@dataclass")
-                wl(outfile, f"class {prod}(Expr):")
+    if first_kind:
+        wl(outfile, f"# Visit method names, indexed by kind - {first_kind}")
+    else:
+        wl(outfile, "# Visit method names, indexed by kind")
 
-                for field in fields.split("  "):
-                    wl(outfile, f"{field}", 1)
+    wl(outfile, f"{base.upper()}_VISITS = (")
 
-                wl(outfile, "def accept(self, visitor):", 1)
-                wl(outfile,
-                   f"return visitor.visit_{prod.lower()}_expr(self)", 2)
+    for prod, fields in nodes:
+        wl(outfile, f'"visit_{prod.lower()}_{suffix}",', 1)
 
-            infile.seek(0)
+    wl(outfile, ")")
 
-            wl(outfile, "class Visitor:")
-            for line in infile.readlines():
-                if line.strip().startswith("#"):
-                    continue
-                
-                if line.strip().startswith(">"):
-                    continue
 
-                prod, fields = [l.strip() for l in line.split("|")]
+def generate_dispatch(outfile, bases):
+    visits = " + ".join(f"{base.upper()}_VISITS" for base in bases)
 
-                wl(outfile,
-                   f"def visit_{prod.lower()}_expr(self, expr: {prod}):", 1)
-                wl(outfile, "pass", 2)
+    wl(outfile)
+    wl(outfile)
+    wl(outfile, "# Visit method names of every node, indexed by kind")
+    wl(outfile, f"NODE_VISITS = {visits}")
+    wl(outfile)
+    wl(outfile)
+    wl(outfile, "def dispatch_table(visitor):")
+    wl(outfile, '"""', 1)
+    wl(outfile, "Returns the bound visit methods of `visitor`,", 1)
+    wl(outfile, "so `table[node.kind](node)` replaces `node.accept`", 1)
+    wl(outfile, '"""', 1)
+    wl(outfile, "return [getattr(visitor, name) for name in NODE_VISITS]", 1)
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python generate_exprs.py [output_dir] "
+              "[expr_grammar] [stmt_grammar]")
+        exit(1)
+
+    print("Generating ast...")
+
+    outputs = []
+    first_kind = 0
+
+    for base, grammar in (("Expr", sys.argv[2]), ("Stmt", sys.argv[3])):
+        header, nodes = read_grammar(grammar)
+        output = path.join(sys.argv[1], f"{base.lower()}.py")
+
+        with open(output, 'w') as outfile:
+            generate(outfile, base, header, nodes, first_kind)
+
+            # The last module sees every node
+            if base == "Stmt":
+                generate_dispatch(outfile, ("Expr", "Stmt"))
+
+        outputs.append(output)
+        first_kind += len(nodes)
 
     print("Formatting with autopep8...")
-    os.system(f"autopep8 {path.join(sys.argv[1], 'expr.py')} -i")
+
+    for output in outputs:
+        os.system(f"autopep8 {output} -i")
 
     print("Done!")
 
@@ -0,0 +1,77 @@
+from array import array
+from scanner.token import Token
+from vm.opcode import NAMES, OPERANDS
+
+
+class Chunk:
+    """
+    A compiled program: a flat instruction stream,
+    the constants it refers to and the tokens used
+    to report runtime errors
+    """
+
+    def __init__(self):
+        # Opcodes and their operands, one int each
+        self.code = array("i")
+
+        self.constants = []
+
+        # Maps the offset of every instruction that can
+        # fail to the token the error should point at
+        self.tokens: dict[int, Token] = {}
+
+        # Index of already added constants, so repeated
+        # literals and names share one entry
+        self.constant_index = {}
+
+    def write(self, op: int, *operands: int, token: Token = None):
+        """
+        Append an instruction and return its offset
+        """
+        offset = len(self.code)
+        self.code.append(op)
+        self.code.extend(operands)
+
+        if token != None:
+            self.tokens[offset] = token
+
+        return offset
+
+    def add_constant(self, value):
+        # Key on the type and repr, so 1 and true or
+        # 0 and -0 don't end up sharing a slot
+        key = (type(value), repr(value))
+
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+
+        return self.constant_index[key]
+
+    def add_name(self, name: Token):
+        """
+        Names are never shared, every use keeps its own
+        token so errors point at the right line
+        """
+        self.constants.append(name)
+        return len(self.constants) - 1
+
+    def disassemble(self):
+        """
+        Returns a human readable listing of the chunk
+        """
+        lines = []
+        offset = 0
+
+        while offset < len(self.code):
+            op = self.code[offset]
+            operands = self.code[offset + 1:offset + 1 + OPERANDS.get(op, 0)]
+            line = f"{offset:06} {NAMES[op]:<18}"
+
+            for operand in operands:
+                line += f" {operand}"
+
+            lines.append(line)
+            offset += 1 + len(operands)
+
+        return "\n".join(lines)
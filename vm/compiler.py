@@ -0,0 +1,257 @@
+from dataclasses import fields
+from parser.expr import Assign, Binary, Call, Expr, Literal, Logical, Unary, ExprVisitor, Grouping, Variable
+from parser.stmt import Block, Expression, ForRange, If, Print, Stmt, StmtVisitor, Var, While
+from scanner.token_type import TokenType as tt
+from vm import opcode as op
+from vm.chunk import Chunk
+
+BINARY_OPS = {
+    tt.PLUS: op.ADD,
+    tt.MINUS: op.SUBTRACT,
+    tt.STAR: op.MULTIPLY,
+    tt.SLASH: op.DIVIDE,
+    tt.MODULO: op.MODULO,
+    tt.EQUAL_EQUAL: op.EQUAL,
+    tt.BANG_EQUAL: op.NOT_EQUAL,
+    tt.GREATER: op.GREATER,
+    tt.GREATER_EQUAL: op.GREATER_EQUAL,
+    tt.LESS: op.LESS,
+    tt.LESS_EQUAL: op.LESS_EQUAL,
+}
+
+
+class Compiler(ExprVisitor, StmtVisitor):
+    """
+    Compiles a resolved tree into a Chunk of bytecode.
+
+    Locals live on the VM's value stack: the value left
+    by a local `var` initializer stays where it is, and a
+    resolved (depth, slot) pair becomes an absolute stack
+    index. Every statement leaves the stack as it found it.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk()
+
+        # Stack index of the first local of every enclosing block
+        self.bases: list[int] = []
+
+        # Number of locals currently on the stack
+        self.local_count = 0
+
+    def compile(self, stmts: list[Stmt]) -> Chunk:
+        for stmt in stmts:
+            self.run(stmt)
+
+        self.chunk.write(op.RETURN)
+        return self.chunk
+
+    def run(self, node: Expr | Stmt):
+        node.accept(self)
+
+    def emit_jump(self, jump: int):
+        """
+        Emit a jump with a placeholder target,
+        returns the offset of the operand to patch
+        """
+        return self.chunk.write(jump, -1) + 1
+
+    def patch_jump(self, operand: int):
+        self.chunk.code[operand] = len(self.chunk.code)
+
+    def local(self, depth: int, slot: int):
+        return self.bases[-1 - depth] + slot
+
+    def visit_block_stmt(self, stmt: Block):
+        # Blocks without locals aren't scopes, depths skip them
+        if not stmt.slots:
+            for statement in stmt.statements:
+                self.run(statement)
+            return
+
+        self.bases.append(self.local_count)
+
+        for statement in stmt.statements:
+            self.run(statement)
+
+        self.bases.pop()
+        self.chunk.write(op.POPN, stmt.slots)
+        self.local_count -= stmt.slots
+
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.slot != None and self.assigns_itself(stmt):
+            # var c = (c = 1) + 2; the slot has to exist before
+            # the initializer runs, its temporaries would be
+            # sitting where the assignment writes otherwise
+            self.chunk.write(op.NIL)
+            self.local_count += 1
+            slot = self.local(0, stmt.slot)
+
+            self.run(stmt.initializer)
+            self.chunk.write(op.SET_LOCAL, slot)
+            self.chunk.write(op.POP)
+            return
+
+        if stmt.initializer != None:
+            self.run(stmt.initializer)
+        else:
+            self.chunk.write(op.NIL)
+
+        if stmt.slot == None:
+            self.chunk.write(op.DEFINE_GLOBAL,
+                             self.chunk.add_name(stmt.name),
+                             token=stmt.name)
+        else:
+            # The initializer's value is the local
+            self.local_count += 1
+
+    def assigns_itself(self, stmt: Var):
+        """
+        Whether the initializer of a local assigns the local.
+        Expressions open no scopes, so an assignment of the
+        same name at depth 0 is to the local being declared.
+        """
+        stack = [stmt.initializer] if stmt.initializer != None else []
+
+        while stack:
+            expr = stack.pop()
+
+            if type(expr) == Assign and expr.depth == 0 \
+                    and expr.name.lexeme == stmt.name.lexeme:
+                return True
+
+            for field in fields(expr):
+                value = getattr(expr, field.name)
+
+                if isinstance(value, Expr):
+                    stack.append(value)
+                elif type(value) == list:
+                    stack.extend(value)
+
+        return False
+
+    def visit_expression_stmt(self, stmt: Expression):
+        expr = stmt.expr
+
+        # An assignment whose value is dropped stores and pops
+        if type(expr) == Assign:
+            self.run(expr.value)
+
+            if expr.depth == None:
+                self.chunk.write(op.STORE_GLOBAL,
+                                 self.chunk.add_name(expr.name),
+                                 token=expr.name)
+            else:
+                self.chunk.write(op.STORE_LOCAL,
+                                 self.local(expr.depth, expr.slot))
+            return
+
+        self.run(expr)
+        self.chunk.write(op.POP)
+
+    def visit_print_stmt(self, stmt: Print):
+        self.run(stmt.expr)
+        self.chunk.write(op.PRINT)
+
+    def visit_if_stmt(self, stmt: If):
+        self.run(stmt.condition)
+        else_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+
+        self.run(stmt.thenBranch)
+
+        if stmt.elseBranch == None:
+            self.patch_jump(else_jump)
+            return
+
+        end_jump = self.emit_jump(op.JUMP)
+        self.patch_jump(else_jump)
+        self.run(stmt.elseBranch)
+        self.patch_jump(end_jump)
+
+    def visit_forrange_stmt(self, stmt: ForRange):
+        # The VM has no counted loop instruction, it runs the While
+        self.run(stmt.loop)
+
+    def visit_while_stmt(self, stmt: While):
+        loop_start = len(self.chunk.code)
+
+        self.run(stmt.condition)
+        exit_jump = self.emit_jump(op.POP_JUMP_IF_FALSE)
+
+        self.run(stmt.body)
+        self.chunk.write(op.LOOP, loop_start, token=stmt.keyword)
+
+        self.patch_jump(exit_jump)
+
+    def visit_literal_expr(self, expr: Literal):
+        if expr.value == None:
+            self.chunk.write(op.NIL)
+        elif expr.value is True:
+            self.chunk.write(op.TRUE)
+        elif expr.value is False:
+            self.chunk.write(op.FALSE)
+        else:
+            self.chunk.write(op.CONSTANT, self.chunk.add_constant(expr.value))
+
+    def visit_grouping_expr(self, expr: Grouping):
+        self.run(expr.expr)
+
+    def visit_variable_expr(self, expr: Variable):
+        if expr.depth == None:
+            self.chunk.write(op.GET_GLOBAL, self.chunk.add_name(expr.name),
+                             token=expr.name)
+        else:
+            self.chunk.write(op.GET_LOCAL, self.local(expr.depth, expr.slot))
+
+    def visit_assign_expr(self, expr: Assign):
+        self.run(expr.value)
+
+        if expr.depth == None:
+            self.chunk.write(op.SET_GLOBAL, self.chunk.add_name(expr.name),
+                             token=expr.name)
+        else:
+            self.chunk.write(op.SET_LOCAL, self.local(expr.depth, expr.slot))
+
+    def visit_logical_expr(self, expr: Logical):
+        self.run(expr.left)
+
+        if expr.op.type == tt.OR:
+            end_jump = self.emit_jump(op.JUMP_IF_TRUE)
+        else:
+            end_jump = self.emit_jump(op.JUMP_IF_FALSE)
+
+        self.chunk.write(op.POP)
+        self.run(expr.right)
+        self.patch_jump(end_jump)
+
+    def visit_unary_expr(self, expr: Unary):
+        self.run(expr.right)
+
+        if expr.op.type == tt.MINUS:
+            self.chunk.write(op.NEGATE, token=expr.op)
+        else:
+            self.chunk.write(op.NOT)
+
+    def visit_binary_expr(self, expr: Binary):
+        right = expr.right
+        instruction = BINARY_OPS[expr.op.type]
+
+        while type(right) == Grouping:
+            right = right.expr
+
+        if type(right) == Literal and type(right.value) in (float, str):
+            self.run(expr.left)
+            self.chunk.write(op.WITH_CONSTANT[instruction],
+                             self.chunk.add_constant(right.value),
+                             token=expr.op)
+            return
+
+        # Right first, like the tree-walker
+        self.run(right)
+        self.run(expr.left)
+        self.chunk.write(instruction, token=expr.op)
+
+    def visit_call_expr(self, expr: Call):
+        self.run(expr.callee)
+        self.chunk.write(op.POP)
+        self.chunk.write(op.NIL)
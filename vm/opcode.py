@@ -0,0 +1,88 @@
+# Instruction set of the bytecode VM
+# Plain ints rather than an Enum so they can index
+# the VM's table of handlers
+
+CONSTANT = 0        # index       push constants[index]
+NIL = 1             #             push nil
+TRUE = 2            #             push true
+FALSE = 3           #             push false
+POP = 4             #             drop the top of the stack
+POPN = 5            # count       drop `count` values
+
+GET_LOCAL = 6       # slot        push stack[slot]
+SET_LOCAL = 7       # slot        stack[slot] = top, top stays
+GET_GLOBAL = 8      # name        push the global `constants[name]`
+SET_GLOBAL = 9      # name        assign top to a global, top stays
+DEFINE_GLOBAL = 10  # name        pop top into a new global
+
+EQUAL = 11
+NOT_EQUAL = 12
+GREATER = 13
+GREATER_EQUAL = 14
+LESS = 15
+LESS_EQUAL = 16
+ADD = 17
+SUBTRACT = 18
+MULTIPLY = 19
+DIVIDE = 20
+MODULO = 21
+NOT = 22
+NEGATE = 23
+
+PRINT = 24
+JUMP = 25           # target      ip = target
+JUMP_IF_FALSE = 26  # target      jump if top is falsey, top stays
+JUMP_IF_TRUE = 27   # target      jump if top is truthy, top stays
+POP_JUMP_IF_FALSE = 28  # target  pop top, jump if it was falsey
+RETURN = 29
+LOOP = 30           # target      ip = target, a loop's back edge
+
+# Superinstructions, the compiler emits them for common
+# sequences so loops go through fewer dispatches
+
+# index  top = top <op> constants[index], for a constant right
+# operand, which can be read after the left one without anyone
+# noticing
+ADD_CONSTANT = 31
+SUBTRACT_CONSTANT = 32
+MULTIPLY_CONSTANT = 33
+DIVIDE_CONSTANT = 34
+MODULO_CONSTANT = 35
+LESS_CONSTANT = 36
+LESS_EQUAL_CONSTANT = 37
+GREATER_CONSTANT = 38
+GREATER_EQUAL_CONSTANT = 39
+EQUAL_CONSTANT = 40
+NOT_EQUAL_CONSTANT = 41
+
+STORE_LOCAL = 42    # slot        pop top into stack[slot]
+STORE_GLOBAL = 43   # name        pop top into a global
+
+NAMES = {
+    value: name for name, value in list(globals().items())
+    if name.isupper() and type(value) == int
+}
+
+# Number of operands following each opcode
+OPERANDS = {
+    CONSTANT: 1, POPN: 1, GET_LOCAL: 1, SET_LOCAL: 1,
+    GET_GLOBAL: 1, SET_GLOBAL: 1, DEFINE_GLOBAL: 1,
+    JUMP: 1, JUMP_IF_FALSE: 1, JUMP_IF_TRUE: 1, POP_JUMP_IF_FALSE: 1,
+    LOOP: 1,
+    ADD_CONSTANT: 1, SUBTRACT_CONSTANT: 1, MULTIPLY_CONSTANT: 1,
+    DIVIDE_CONSTANT: 1, MODULO_CONSTANT: 1, LESS_CONSTANT: 1,
+    LESS_EQUAL_CONSTANT: 1, GREATER_CONSTANT: 1, GREATER_EQUAL_CONSTANT: 1,
+    EQUAL_CONSTANT: 1, NOT_EQUAL_CONSTANT: 1,
+    STORE_LOCAL: 1, STORE_GLOBAL: 1,
+}
+
+# The superinstruction for each operator, with a constant
+# for its right operand
+WITH_CONSTANT = {
+    ADD: ADD_CONSTANT, SUBTRACT: SUBTRACT_CONSTANT,
+    MULTIPLY: MULTIPLY_CONSTANT, DIVIDE: DIVIDE_CONSTANT,
+    MODULO: MODULO_CONSTANT, LESS: LESS_CONSTANT,
+    LESS_EQUAL: LESS_EQUAL_CONSTANT, GREATER: GREATER_CONSTANT,
+    GREATER_EQUAL: GREATER_EQUAL_CONSTANT, EQUAL: EQUAL_CONSTANT,
+    NOT_EQUAL: NOT_EQUAL_CONSTANT,
+}
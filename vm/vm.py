@@ -0,0 +1,450 @@
+from interpreter.interpreter import Interpreter
+from interpreter.lox_runtime_error import LoxRuntimeError
+from parser.stmt import Stmt
+from vm.chunk import Chunk
+from vm.compiler import Compiler
+from vm.opcode import (ADD, ADD_CONSTANT, CONSTANT, DEFINE_GLOBAL, DIVIDE,
+                       DIVIDE_CONSTANT, EQUAL, EQUAL_CONSTANT, FALSE,
+                       GET_GLOBAL, GET_LOCAL, GREATER, GREATER_CONSTANT,
+                       GREATER_EQUAL, GREATER_EQUAL_CONSTANT, JUMP,
+                       JUMP_IF_FALSE, JUMP_IF_TRUE, LESS, LESS_CONSTANT,
+                       LESS_EQUAL, LESS_EQUAL_CONSTANT, LOOP, MODULO,
+                       MODULO_CONSTANT, MULTIPLY, MULTIPLY_CONSTANT, NAMES,
+                       NEGATE, NIL, NOT, NOT_EQUAL, NOT_EQUAL_CONSTANT, POP,
+                       POP_JUMP_IF_FALSE, POPN, PRINT, RETURN, SET_GLOBAL,
+                       SET_LOCAL, STORE_GLOBAL, STORE_LOCAL, SUBTRACT,
+                       SUBTRACT_CONSTANT, TRUE)
+
+
+class VM(Interpreter):
+    """
+    Stack based virtual machine running the bytecode
+    produced by vm.compiler. Shares the globals and the
+    value helpers of the tree-walker. Each opcode has a
+    handler, dispatch indexes a table of them.
+    """
+
+    @classmethod
+    def compile_program(cls, stmts: list[Stmt]):
+        return Compiler().compile(stmts)
+
+    def execute_compiled(self, chunk: Chunk):
+        self.execute(chunk)
+
+    def execute(self, chunk: Chunk):
+        # Indexing a list hands back the ints it holds, an array
+        # boxes a new one on every read
+        code = list(chunk.code)
+        constants = chunk.constants
+        tokens = chunk.tokens
+        environment = self.globals
+        variables = environment.variables
+        stringify = self.stringify
+        write = self.stdout.write
+        budget = self.budget
+
+        # Lexemes of the names global instructions refer to
+        names = [getattr(constant, "lexeme", None) for constant in constants]
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        # Every instruction is a function taking its own offset
+        # and returning the offset of the next one, RETURN's is
+        # negative. Dispatch is one index into `handlers`, so
+        # no instruction pays for the ones tested before it.
+
+        def numbers_error(ip: int):
+            return LoxRuntimeError("Operands must be numbers", tokens[ip])
+
+        def divide_error(ip: int, left, right):
+            return LoxRuntimeError(f"Division by 0 between {stringify(left)} "
+                                   f"and {stringify(right)}", tokens[ip])
+
+        def undefined_error(ip: int):
+            name = constants[code[ip + 1]]
+            return LoxRuntimeError(f"Undefined variable "
+                                   f"'{name.lexeme}'", name)
+
+        def constant(ip: int):
+            push(constants[code[ip + 1]])
+            return ip + 2
+
+        def nil(ip: int):
+            push(None)
+            return ip + 1
+
+        def true(ip: int):
+            push(True)
+            return ip + 1
+
+        def false(ip: int):
+            push(False)
+            return ip + 1
+
+        def pop_one(ip: int):
+            pop()
+            return ip + 1
+
+        def pop_n(ip: int):
+            del stack[len(stack) - code[ip + 1]:]
+            return ip + 2
+
+        def get_local(ip: int):
+            push(stack[code[ip + 1]])
+            return ip + 2
+
+        def set_local(ip: int):
+            stack[code[ip + 1]] = stack[-1]
+            return ip + 2
+
+        def store_local(ip: int):
+            stack[code[ip + 1]] = pop()
+            return ip + 2
+
+        def get_global(ip: int):
+            try:
+                push(variables[names[code[ip + 1]]])
+            except KeyError:
+                raise undefined_error(ip)
+
+            return ip + 2
+
+        def set_global(ip: int):
+            name = names[code[ip + 1]]
+
+            if name not in variables:
+                raise undefined_error(ip)
+
+            variables[name] = stack[-1]
+            return ip + 2
+
+        def store_global(ip: int):
+            name = names[code[ip + 1]]
+
+            if name not in variables:
+                raise undefined_error(ip)
+
+            variables[name] = pop()
+            return ip + 2
+
+        def define_global(ip: int):
+            environment.define(constants[code[ip + 1]], pop())
+            return ip + 2
+
+        def equal(ip: int):
+            left = pop()
+            stack[-1] = left == stack[-1]
+            return ip + 1
+
+        def equal_constant(ip: int):
+            stack[-1] = stack[-1] == constants[code[ip + 1]]
+            return ip + 2
+
+        def not_equal(ip: int):
+            left = pop()
+            stack[-1] = left != stack[-1]
+            return ip + 1
+
+        def not_equal_constant(ip: int):
+            stack[-1] = stack[-1] != constants[code[ip + 1]]
+            return ip + 2
+
+        def add(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if (type(left) == float and type(right) == float) \
+                    or (type(left) == str and type(right) == str):
+                stack[-1] = left + right
+            else:
+                stack[-1] = None
+
+            return ip + 1
+
+        def add_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if (type(left) == float and type(right) == float) \
+                    or (type(left) == str and type(right) == str):
+                stack[-1] = left + right
+            else:
+                stack[-1] = None
+
+            return ip + 2
+
+        def subtract(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left - right
+            return ip + 1
+
+        def subtract_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left - right
+            return ip + 2
+
+        def multiply(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left * right
+            return ip + 1
+
+        def multiply_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left * right
+            return ip + 2
+
+        def divide(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            if right == 0:
+                raise divide_error(ip, left, right)
+
+            stack[-1] = left / right
+            return ip + 1
+
+        def divide_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            if right == 0:
+                raise divide_error(ip, left, right)
+
+            stack[-1] = left / right
+            return ip + 2
+
+        def modulo(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left % right
+            return ip + 1
+
+        def modulo_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left % right
+            return ip + 2
+
+        def less(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left < right
+            return ip + 1
+
+        def less_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left < right
+            return ip + 2
+
+        def less_equal(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left <= right
+            return ip + 1
+
+        def less_equal_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left <= right
+            return ip + 2
+
+        def greater(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left > right
+            return ip + 1
+
+        def greater_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left > right
+            return ip + 2
+
+        def greater_equal(ip: int):
+            left = pop()
+            right = stack[-1]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left >= right
+            return ip + 1
+
+        def greater_equal_constant(ip: int):
+            left = stack[-1]
+            right = constants[code[ip + 1]]
+
+            if type(left) is not float or type(right) is not float:
+                raise numbers_error(ip)
+
+            stack[-1] = left >= right
+            return ip + 2
+
+        def negate(ip: int):
+            if type(stack[-1]) is not float:
+                raise LoxRuntimeError("Operand must be a number",
+                                      tokens[ip])
+
+            stack[-1] = -stack[-1]
+            return ip + 1
+
+        def not_(ip: int):
+            value = stack[-1]
+            stack[-1] = value is None or value is False
+            return ip + 1
+
+        def print_(ip: int):
+            write(f"{stringify(pop())}\n")
+            return ip + 1
+
+        def jump(ip: int):
+            return code[ip + 1]
+
+        def jump_if_false(ip: int):
+            value = stack[-1]
+
+            if value is None or value is False:
+                return code[ip + 1]
+
+            return ip + 2
+
+        def jump_if_true(ip: int):
+            value = stack[-1]
+
+            if value is None or value is False:
+                return ip + 2
+
+            return code[ip + 1]
+
+        def pop_jump_if_false(ip: int):
+            value = pop()
+
+            if value is None or value is False:
+                return code[ip + 1]
+
+            return ip + 2
+
+        def loop(ip: int):
+            return code[ip + 1]
+
+        def loop_step(ip: int):
+            budget.step(tokens[ip])
+            return code[ip + 1]
+
+        def return_(ip: int):
+            return -1
+
+        def unknown(ip: int):
+            raise RuntimeError(f"Unknown opcode {code[ip]} at {ip}")
+
+        handlers = [unknown] * (max(NAMES) + 1)
+        handlers[CONSTANT] = constant
+        handlers[NIL] = nil
+        handlers[TRUE] = true
+        handlers[FALSE] = false
+        handlers[POP] = pop_one
+        handlers[POPN] = pop_n
+        handlers[GET_LOCAL] = get_local
+        handlers[SET_LOCAL] = set_local
+        handlers[STORE_LOCAL] = store_local
+        handlers[GET_GLOBAL] = get_global
+        handlers[SET_GLOBAL] = set_global
+        handlers[STORE_GLOBAL] = store_global
+        handlers[DEFINE_GLOBAL] = define_global
+        handlers[EQUAL] = equal
+        handlers[EQUAL_CONSTANT] = equal_constant
+        handlers[NOT_EQUAL] = not_equal
+        handlers[NOT_EQUAL_CONSTANT] = not_equal_constant
+        handlers[ADD] = add
+        handlers[ADD_CONSTANT] = add_constant
+        handlers[SUBTRACT] = subtract
+        handlers[SUBTRACT_CONSTANT] = subtract_constant
+        handlers[MULTIPLY] = multiply
+        handlers[MULTIPLY_CONSTANT] = multiply_constant
+        handlers[DIVIDE] = divide
+        handlers[DIVIDE_CONSTANT] = divide_constant
+        handlers[MODULO] = modulo
+        handlers[MODULO_CONSTANT] = modulo_constant
+        handlers[LESS] = less
+        handlers[LESS_CONSTANT] = less_constant
+        handlers[LESS_EQUAL] = less_equal
+        handlers[LESS_EQUAL_CONSTANT] = less_equal_constant
+        handlers[GREATER] = greater
+        handlers[GREATER_CONSTANT] = greater_constant
+        handlers[GREATER_EQUAL] = greater_equal
+        handlers[GREATER_EQUAL_CONSTANT] = greater_equal_constant
+        handlers[NEGATE] = negate
+        handlers[NOT] = not_
+        handlers[PRINT] = print_
+        handlers[JUMP] = jump
+        handlers[JUMP_IF_FALSE] = jump_if_false
+        handlers[JUMP_IF_TRUE] = jump_if_true
+        handlers[POP_JUMP_IF_FALSE] = pop_jump_if_false
+        handlers[LOOP] = loop if budget == None else loop_step
+        handlers[RETURN] = return_
+
+        ip = 0
+
+        while ip >= 0:
+            ip = handlers[code[ip]](ip)